@@ -0,0 +1,446 @@
+# autopilot/backtest.py
+"""Offline backtest of the decision parameters in config.json.
+
+Replays one page's recorded cycles (logs/cycles.jsonl) through the same rules
+as run._run_page (guardrail, min impressions, rollback, explore with intent
+preference and per-intent template rotation) for a grid of parameter sets at
+once: every grid row is one lane of NumPy arrays, and the grid is split into
+chunks over a process pool.
+
+Outcomes: while a simulated policy shows the variant that was actually live,
+the recorded outbound clicks are used; for any other variant the clicks are
+modeled from its observed rate in state.json, shrunk towards the page rate
+(`prior_impressions` pseudo-impressions). Variants never observed therefore
+score the page average: the backtest can rank parameters, not invent lift.
+
+Grid rows with thompson=1 use selection_mode "thompson" (autopilot.bandit):
+each lane serves the argmax of a Gamma posterior draw from its own simulated
+aggregates instead of rotating/rolling back. One lane is one random path, so
+every thompson row is simulated `thompson_draws` times (config
+"backtest_thompson_draws") and reported as the mean, with its spread in
+sim_outbound_per_1k_sd. Rows with sprt=1 use
+rollback_test "sprt" (autopilot.sequential): rollback on the sequential
+test instead of the eval_min_* thresholds; a crossed boundary is final until
+the next change, and the rollback still waits for the guardrail.
+
+Parameters a row's mode never reads are left empty (e.g. the eval_min_* and
+explore settings on thompson rows), so each distinct policy is listed once.
+
+The NumPy lanes re-state decision.decide(); every run first replays a
+sample of grid rows through decide() itself (check_parity, BACKTEST_PARITY
+rows, 0 to skip) and stops if any outcome differs.
+
+    python -m autopilot.backtest        (BACKTEST_PAGE, BACKTEST_WORKERS, BACKTEST_TOP, BACKTEST_PARITY)
+"""
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from autopilot.config import load_config
+from autopilot.cycle_log import iter_records
+from autopilot.decision import DecisionParams, decide
+from autopilot.scoring import record_observation
+from autopilot.sequential import add_evidence
+from autopilot.state_store import load_state
+from autopilot.templates import build_templates
+
+CYCLES_PATH = "autopilot/logs/cycles.jsonl"
+OUTPUT_CSV = "data/backtest.csv"
+
+# Parameter -> candidate values (config "backtest_grid" overrides per key)
+DEFAULT_GRID = {
+    "guardrail_days": [0, 7, 14, 21, 28],
+    "min_impressions_to_change": [0, 50, 80, 150],
+    "eval_min_impressions": [60, 120, 240],
+    "eval_min_outbound_clicks": [1, 2, 5],
+    "rollback_drop_pct": [0.1, 0.2, 0.3, 0.45, 0.6, 0.8],
+    "prefer_best_intent": [0, 1],
+    "intent_switch_margin_pct": [0.0, 0.15, 0.3],
+    "best_intent_min_outbound_clicks": [1, 3, 6],
+    "bandit_prior_impressions": [100, 200, 400],
+    "thompson": [0, 1],
+    "sprt": [0, 1],
+}
+CHUNK_ROWS = 2048
+THOMPSON_DRAWS = 64
+PARITY_ROWS = 64
+
+# Grid keys a row does not use, by mode (blanked so the same policy is not listed several times)
+_INTENT_KEYS = ("intent_switch_margin_pct", "best_intent_min_outbound_clicks")
+_IGNORED = {
+    "threshold": ("bandit_prior_impressions", "sprt_alpha", "sprt_beta"),
+    "sprt": ("bandit_prior_impressions", "eval_min_impressions", "eval_min_outbound_clicks"),
+    "thompson": ("sprt", "eval_min_impressions", "eval_min_outbound_clicks", "rollback_drop_pct", "sprt_alpha", "sprt_beta",
+                 "prefer_best_intent", *_INTENT_KEYS),
+}
+
+
+def _day(ts: str) -> date:
+    return datetime.fromisoformat(ts.replace("Z", "+00:00")).date()
+
+
+def _page_state(state: dict, page: str) -> dict:
+    return (state.get("pages") or {}).get(page) or state
+
+
+def build_timeline(cycles: list, page_state: dict, templates: dict, prior_impressions: float = 1000.0) -> dict:
+    """Arrays the simulation steps through, one entry per recorded cycle (oldest first).
+
+    Each cycle contributes the traffic of the days since the previous cycle
+    (window totals scaled by days/window length), so overlapping rolling
+    windows are not counted twice. `window_impr` is the unscaled window total
+    that run.py passed to decide() (the min_impressions_to_change check).
+    """
+    intents = list(templates)
+    keys = ["baseline"] + [f"{i}#{j}" for i in intents for j in range(len(templates[i]))]
+    col = {k: n for n, k in enumerate(keys)}
+
+    variants = page_state.get("variants") or {}
+    impr = np.array([float((variants.get(k) or {}).get("score_agg", {}).get("impressions", 0.0)) for k in keys])
+    out = np.array([float((variants.get(k) or {}).get("score_agg", {}).get("outbound_clicks", 0.0)) for k in keys])
+    page_rate = out.sum() / impr.sum() if impr.sum() > 0 else 0.0
+    rate = (out + prior_impressions * page_rate) / (impr + prior_impressions)
+
+    days, traffic, window_impr, clicks, dominant, logged = [], [], [], [], [], []
+    prev_day, prev_key = None, None
+    for c in cycles:
+        d = _day(c["timestamp_utc"])
+        w = c.get("window") or {}
+        w_days = max(1, (date.fromisoformat(w["end"]) - date.fromisoformat(w["start"])).days + 1) if w.get("start") else 7
+        m = c.get("metrics") or {}
+        share = min(1.0, (d - prev_day).days / w_days) if prev_day else 1.0
+        days.append((d - _day(cycles[0]["timestamp_utc"])).days)
+        traffic.append(float(m.get("impressions", 0.0)) * share)
+        window_impr.append(float(m.get("impressions", 0.0)))
+        clicks.append(float(m.get("outbound_clicks", 0.0)) * share)
+        dom = c.get("dominant_intent")
+        dominant.append(intents.index(dom) if dom in intents else 0)
+        logged.append(col.get(prev_key, -1))
+        prev_day, prev_key = d, (c.get("chosen") or {}).get("variant_key")
+
+    member = np.zeros((len(keys), len(intents)))
+    for k, n in col.items():
+        if "#" in k:
+            member[n, intents.index(k.split("#", 1)[0])] = 1.0
+    return {
+        "keys": keys,
+        "intents": intents,
+        "pool": np.array([len(templates[i]) for i in intents]),
+        "first_col": np.array([col[f"{i}#0"] for i in intents]),
+        "member": member,
+        "rate": rate,
+        "day": np.array(days),
+        "traffic": np.array(traffic),
+        "window_impr": np.array(window_impr),
+        "clicks": np.array(clicks),
+        "dominant": np.array(dominant),
+        "logged": np.array(logged),
+    }
+
+
+def expand_grid(grid: dict) -> pd.DataFrame:
+    """Every combination of `grid`, minus the ones that only differ in parameters their mode ignores."""
+    names = list(grid)
+    df = pd.DataFrame(list(itertools.product(*(grid[n] for n in names))), columns=names).astype(float)
+    thompson = df["thompson"] > 0 if "thompson" in df else pd.Series(False, index=df.index)
+    sprt = (df["sprt"] > 0 if "sprt" in df else pd.Series(False, index=df.index)) & ~thompson
+    for mode, rows in (("threshold", ~thompson & ~sprt), ("sprt", sprt), ("thompson", thompson)):
+        cols = [c for c in _IGNORED[mode] if c in df]
+        df.loc[rows, cols] = np.nan
+    if "prefer_best_intent" in df:
+        df.loc[df["prefer_best_intent"] == 0, [c for c in _INTENT_KEYS if c in df]] = np.nan
+    return df.drop_duplicates(ignore_index=True)
+
+
+def _first_max(value: np.ndarray, seen: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Per lane, the column with the highest value among `seen` ones; ties go to the first seen.
+
+    That is the dict order scoring.choose_best_variant / choose_best_intent iterate in.
+    """
+    top = np.where(seen, value, -np.inf).max(axis=1, keepdims=True)
+    return np.where(seen & (value == top), first, np.iinfo(np.int64).max).argmin(axis=1)
+
+
+def simulate(tl: dict, params: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Run every parameter row of `params` over the timeline; one result row per parameter row.
+
+    Non-thompson rows must give what decide_path() gives for the same row (see check_parity).
+    """
+    G, V, K = len(params), len(tl["keys"]), len(tl["intents"])
+    rows = np.arange(G)
+    p = {k: params[k].to_numpy(dtype=float) for k in params.columns}
+    thompson = p.get("thompson", np.zeros(G)) > 0
+    prior = np.nan_to_num(p.get("bandit_prior_impressions", np.full(G, 200.0)), nan=200.0)[:, None]
+    rng = np.random.default_rng(seed)
+    sprt = p.get("sprt", np.zeros(G)) > 0
+    alpha, beta = p.get("sprt_alpha", np.full(G, 0.05)), p.get("sprt_beta", np.full(G, 0.2))
+    lower, upper = np.log(beta / (1.0 - alpha)), np.log((1.0 - beta) / alpha)   # sequential.sprt_bounds, per lane
+
+    active = np.zeros(G, dtype=int)                  # baseline
+    last_change = np.full(G, -10 ** 6)
+    agg_impr = np.zeros((G, V))
+    agg_out = np.zeros((G, V))
+    seen = np.zeros((G, V), dtype=bool)
+    first = np.zeros((G, V), dtype=np.int64)         # step a variant was first observed (state dict order)
+    key_intent = np.where(tl["member"].any(axis=1), tl["member"].argmax(axis=1), -1)
+    # intent totals summed in observation order, like state["intent_agg"]
+    i_impr = np.zeros((G, K))
+    i_out = np.zeros((G, K))
+    i_seen = np.zeros((G, K), dtype=bool)
+    i_first = np.zeros((G, K), dtype=np.int64)
+    tidx = np.zeros((G, K), dtype=int)
+    total_out = np.zeros(G)
+    changes = np.zeros(G, dtype=int)
+    rollbacks = np.zeros(G, dtype=int)
+    seq_done = np.zeros(G, dtype=int)                # sprt boundary crossed since the last change: 1 keep, 2 rollback
+    seq_best = np.zeros(G, dtype=int)                # the variant a "rollback" was tested against
+
+    for t in range(len(tl["day"])):
+        # ---- outcome of the variant each lane had live during this cycle ----
+        live = active == tl["logged"][t]
+        got = np.where(live, tl["clicks"][t], tl["traffic"][t] * tl["rate"][active])
+        agg_impr[rows, active] += tl["traffic"][t]
+        agg_out[rows, active] += got
+        first[rows, active] = np.where(seen[rows, active], first[rows, active], t)
+        seen[rows, active] = True
+        has_intent = key_intent[active] >= 0
+        r_i, k_i = rows[has_intent], key_intent[active][has_intent]
+        i_impr[r_i, k_i] += tl["traffic"][t]
+        i_out[r_i, k_i] += got[has_intent]
+        i_first[r_i, k_i] = np.where(i_seen[r_i, k_i], i_first[r_i, k_i], t)
+        i_seen[r_i, k_i] = True
+        total_out += got
+
+        can_change = (tl["day"][t] - last_change) >= p["guardrail_days"]
+
+        # ---- current vs best (choose_best_variant: observed variants only) ----
+        out_1k = np.where(agg_impr > 0, 1000.0 * agg_out / np.maximum(agg_impr, 1e-9), 0.0)
+        best = _first_max(out_1k, seen, first)
+        cur_1k, best_1k = out_1k[rows, active], out_1k[rows, best]
+        enough = (agg_impr[rows, active] >= p["eval_min_impressions"]) & (agg_out[rows, active] >= p["eval_min_outbound_clicks"])
+        better = (best != active) & (best_1k > 0)
+        drop = 1.0 - cur_1k / np.where(best_1k > 0, best_1k, 1.0)
+        rollback = can_change & enough & better & (drop >= p["rollback_drop_pct"]) & (agg_out[rows, best] >= p["eval_min_outbound_clicks"])
+
+        # ---- sprt: LLR of "current is drop% below best" on the two variants' totals ----
+        i_c, i_b = agg_impr[rows, active], agg_impr[rows, best]
+        q = 1.0 - p["rollback_drop_pct"]
+        p0 = i_c / np.maximum(i_c + i_b, 1e-9)
+        p1 = q * i_c / np.maximum(q * i_c + i_b, 1e-9)
+        valid = better & (i_c > 0) & (i_b > 0) & (q > 0.0) & (q < 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            llr = agg_out[rows, active] * np.log(p1 / p0) + agg_out[rows, best] * np.log((1.0 - p1) / (1.0 - p0))
+        # each cycle's slice is new traffic of the live variant, so the totals count every day once
+        llr = np.nan_to_num(llr, nan=0.0)
+        testing = sprt & (seq_done == 0) & valid
+        seq_best = np.where(testing & (llr >= upper), best, seq_best)
+        seq_done = np.where(testing & (llr >= upper), 2, np.where(testing & (llr <= lower), 1, seq_done))
+
+        can_change &= tl["window_impr"][t] >= p["min_impressions_to_change"]
+        rollback = np.where(sprt, seq_done == 2, rollback) & can_change & ~thompson
+        target = np.where(sprt, seq_best, best)
+        explore = can_change & ~rollback & ~thompson
+        sampled = can_change & thompson
+
+        # ---- thompson: argmax of one Gamma posterior draw per lane ----
+        pooled = (agg_out.sum(axis=1) / np.maximum(agg_impr.sum(axis=1), 1e-9))[:, None]
+        draw = rng.gamma(1.0 + prior * pooled + agg_out, 1.0 / (prior + agg_impr))
+        pick = draw.argmax(axis=1)
+
+        # ---- explore: dominant intent, or the best intent when it has proven better ----
+        dom = tl["dominant"][t]
+        i_1k = np.where(i_impr > 0, 1000.0 * i_out / np.maximum(i_impr, 1e-9), 0.0)
+        i_best = _first_max(i_1k, i_seen, i_first)
+        b_1k, d_1k = i_1k[rows, i_best], i_1k[:, dom]
+        switch = (
+            (p["prefer_best_intent"] > 0) & i_seen.any(axis=1) & (i_best != dom)
+            & (i_out[rows, i_best] >= p["best_intent_min_outbound_clicks"])
+            & (((d_1k <= 0) & (b_1k > 0)) | (b_1k > d_1k * (1.0 + p["intent_switch_margin_pct"])))
+        )
+        intent = np.where(switch, i_best, dom)
+        idx = tidx[rows, intent] % tl["pool"][intent]
+        explored = tl["first_col"][intent] + idx
+
+        # rollback keeps the winner's rotation index, explore advances it
+        r_intent = tl["member"][target].argmax(axis=1)
+        r_is_intent = target > 0
+        tidx[rows, intent] = np.where(explore, (idx + 1) % tl["pool"][intent], tidx[rows, intent])
+        r_idx = target - tl["first_col"][r_intent]
+        tidx[rows, r_intent] = np.where(rollback & r_is_intent, r_idx, tidx[rows, r_intent])
+
+        new_active = np.where(rollback, target, np.where(explore, explored, np.where(sampled, pick, active)))
+        # only an HTML change (a different variant) restarts the guardrail
+        changed = (rollback | explore | sampled) & (new_active != active)
+        active = new_active
+        last_change = np.where(changed, tl["day"][t], last_change)
+        seq_done = np.where(changed, 0, seq_done)
+        changes += changed
+        rollbacks += rollback
+
+    total_impr = float(tl["traffic"].sum())
+    res = params.copy()
+    res["sim_outbound_clicks"] = total_out.round(2)
+    res["sim_outbound_per_1k_impr"] = (1000.0 * total_out / total_impr).round(3) if total_impr > 0 else 0.0
+    res["changes"] = changes
+    res["rollbacks"] = rollbacks
+    res["final_variant"] = np.array(tl["keys"])[active]
+    return res
+
+
+def _decision_params(row: dict) -> DecisionParams:
+    """DecisionParams of one grid row (blank cells keep the defaults: the row's mode ignores them)."""
+    names = {
+        "min_impressions_to_change": "min_impressions_to_change",
+        "eval_min_impressions": "eval_min_impressions",
+        "eval_min_outbound_clicks": "eval_min_outbound",
+        "rollback_drop_pct": "rollback_drop_pct",
+        "prefer_best_intent": "prefer_best_intent",
+        "intent_switch_margin_pct": "intent_switch_margin_pct",
+        "best_intent_min_outbound_clicks": "best_intent_min_outbound",
+        "sprt_alpha": "sprt_alpha",
+        "sprt_beta": "sprt_beta",
+    }
+    kw = {field: row[k] for k, field in names.items() if k in row and not pd.isna(row[k])}
+    if "prefer_best_intent" in kw:
+        kw["prefer_best_intent"] = bool(kw["prefer_best_intent"])
+    return DecisionParams(rollback_test="sprt" if row.get("sprt", 0) == 1 else "threshold", **kw)
+
+
+def decide_path(tl: dict, row: dict) -> dict:
+    """One non-thompson grid row through decision.decide() itself, one cycle at a time.
+
+    The reference simulate() is checked against: same outcomes, same state
+    bookkeeping as run._run_page (each cycle's slice is its own window).
+    """
+    params = _decision_params(row)
+    pool_sizes = {i: int(n) for i, n in zip(tl["intents"], tl["pool"])}
+    state = {"variants": {}, "intent_agg": {}, "template_index_by_intent": {}, "history": [], "active_variant": {"variant_key": "baseline"}}
+    last_day = -10 ** 6
+    total = 0.0
+    changes = rollbacks = 0
+    for t in range(len(tl["day"])):
+        key = state["active_variant"]["variant_key"]
+        c = tl["keys"].index(key)
+        got = tl["clicks"][t] if c == tl["logged"][t] else tl["traffic"][t] * tl["rate"][c]
+        obs = {"window": {"start": f"{t:06d}", "end": f"{t:06d}"}, "metrics": {"impressions": tl["traffic"][t], "gsc_clicks": 0.0, "outbound_clicks": got}}
+        record_observation(state, key, obs)
+        add_evidence(state, key, obs)
+        total += got
+
+        can_change = bool(tl["day"][t] - last_day >= row["guardrail_days"])
+        d = decide(state, tl["window_impr"][t], {tl["intents"][tl["dominant"][t]]: 1.0}, pool_sizes, params, can_change)
+        delta = d["state_delta"]
+        if "sequential_test" in delta:
+            state["sequential_test"] = delta["sequential_test"]
+        if "active_variant_key" in delta:
+            state["template_index_by_intent"].update(delta.get("template_index_by_intent", {}))
+            rollbacks += d["action"] == "rollback"
+            if delta["active_variant_key"] != key:
+                state["active_variant"] = {"variant_key": delta["active_variant_key"]}
+                state["history"].append({"timestamp_utc": f"{t:06d}", "action": d["action"], "changed_html": True})
+                last_day = tl["day"][t]
+                changes += 1
+    return {"sim_outbound_clicks": round(float(total), 2), "changes": changes, "rollbacks": rollbacks, "final_variant": state["active_variant"]["variant_key"]}
+
+
+def check_parity(tl: dict, params: pd.DataFrame, n: int = 64, seed: int = 0) -> list:
+    """Grid rows (a sample of `n` non-thompson ones) where simulate() and decide_path() disagree."""
+    rows = params[params.get("thompson", pd.Series(0.0, index=params.index)) != 1]
+    rows = rows.sample(min(n, len(rows)), random_state=seed) if n else rows
+    fast = simulate(tl, rows.reset_index(drop=True))
+    bad = []
+    for (_, row), (_, sim) in zip(rows.iterrows(), fast.iterrows()):
+        ref = decide_path(tl, row.to_dict())
+        if any(ref[k] != sim[k] for k in ref):
+            bad.append({"params": row.to_dict(), "simulate": {k: sim[k] for k in ref}, "decide": ref})
+    return bad
+
+
+def _simulate_chunk(args: tuple) -> pd.DataFrame:
+    return simulate(*args)
+
+
+def run_backtest(
+    page: str,
+    grid: dict,
+    cycles_path: str = CYCLES_PATH,
+    state: dict | None = None,
+    templates: dict | None = None,
+    prior_impressions: float = 1000.0,
+    max_workers: int | None = None,
+    thompson_draws: int = THOMPSON_DRAWS,
+    parity_rows: int = PARITY_ROWS,
+) -> pd.DataFrame:
+    """Ranked table (best simulated outbound clicks per 1k impressions first) for every grid row.
+
+    Thompson rows are the mean of `thompson_draws` simulated paths. Raises
+    when `parity_rows` sampled rows disagree with decide_path().
+    """
+    cycles = list(iter_records(cycles_path, where=lambda r: r.get("page", page) == page))
+    if not cycles:
+        raise RuntimeError(f"No recorded cycles for {page} in {cycles_path}")
+    state = state if state is not None else load_state()
+    templates = templates or build_templates(topic="", city="", year="")
+    tl = build_timeline(cycles, _page_state(state, page), templates, prior_impressions)
+
+    params = expand_grid(grid)
+    if parity_rows:
+        bad = check_parity(tl, params, parity_rows)
+        if bad:
+            raise RuntimeError(f"[BACKTEST] simulate() disagrees with decision.decide() on {len(bad)}/{parity_rows} rows, e.g. {bad[0]}")
+        print(f"[BACKTEST] parity with decision.decide(): {min(parity_rows, len(params))} rows ok")
+    repeats = np.where(params.get("thompson", pd.Series(0.0, index=params.index)) > 0, max(int(thompson_draws), 1), 1)
+    lanes = params.loc[params.index.repeat(repeats)].rename_axis("combo").reset_index()
+    chunks = [(tl, lanes.iloc[i:i + CHUNK_ROWS], i) for i in range(0, len(lanes), CHUNK_ROWS)]
+    if len(chunks) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(chunks), os.cpu_count() or 1)) as pool:
+            parts = list(pool.map(_simulate_chunk, chunks))
+    else:
+        parts = [simulate(*c) for c in chunks]
+
+    sims = pd.concat(parts, ignore_index=True).groupby("combo", sort=True).agg(
+        sim_outbound_clicks=("sim_outbound_clicks", "mean"),
+        sim_outbound_per_1k_impr=("sim_outbound_per_1k_impr", "mean"),
+        sim_outbound_per_1k_sd=("sim_outbound_per_1k_impr", "std"),
+        changes=("changes", "mean"),
+        rollbacks=("rollbacks", "mean"),
+        final_variant=("final_variant", lambda s: s.mode().iat[0]),
+        draws=("changes", "size"),
+    )
+    out = params.join(sims.round({"sim_outbound_clicks": 2, "sim_outbound_per_1k_impr": 3, "sim_outbound_per_1k_sd": 3, "changes": 1, "rollbacks": 1}))
+    print(f"[BACKTEST] page={page} cycles={len(cycles)} combos={len(out)} lanes={len(lanes)} logged_outbound_per_1k={1000.0 * tl['clicks'].sum() / max(tl['traffic'].sum(), 1e-9):.3f}")
+    return out.sort_values(["sim_outbound_per_1k_impr", "changes"], ascending=[False, True], ignore_index=True)
+
+
+def main():
+    cfg = load_config()
+    page = os.getenv("BACKTEST_PAGE") or cfg.get("html_path")
+    grid = {**DEFAULT_GRID, **(cfg.get("backtest_grid") or {})}
+    workers = int(os.getenv("BACKTEST_WORKERS", "0")) or None
+    top = int(os.getenv("BACKTEST_TOP", "15"))
+
+    ranked = run_backtest(
+        page, grid,
+        prior_impressions=float(cfg.get("backtest_prior_impressions", 1000)),
+        max_workers=workers,
+        thompson_draws=int(cfg.get("backtest_thompson_draws", THOMPSON_DRAWS)),
+        parity_rows=int(os.getenv("BACKTEST_PARITY", str(PARITY_ROWS))),
+    )
+    os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
+    ranked.to_csv(OUTPUT_CSV, index=False)
+
+    current = {k: cfg.get(k) for k in grid}
+    current.update(thompson=int(cfg.get("selection_mode") == "thompson"), sprt=int(cfg.get("rollback_test") == "sprt"))
+    print(f"Saved: {OUTPUT_CSV}")
+    print(f"Current config: {current}")
+    print(ranked.head(top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# autopilot/bandit.py
+"""Thompson sampling over template variants (config "selection_mode": "thompson").
+
+Outbound clicks per impression are treated as a Poisson rate with a Gamma
+posterior per variant, built from the aggregates already in state["variants"]:
+
+    rate ~ Gamma(a0 + outbound_clicks, b0 + impressions)
+
+The prior is the page's pooled rate worth `prior_impressions` impressions, so
+an unseen variant starts at the page average with a wide posterior. Each
+cycle serves one draw's argmax: a variant is shown about as often as it is
+likely to be the best, instead of in strict rotation.
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+
+SUMMARY_DRAWS = 2000
+
+
+def arm_keys(pool_sizes: Dict[str, int], include_baseline: bool = True) -> List[str]:
+    keys = ["baseline"] if include_baseline else []
+    return keys + [f"{i}#{j}" for i, n in pool_sizes.items() for j in range(n)]
+
+
+def posteriors(variants: dict, keys: List[str], prior_impressions: float = 200.0) -> tuple[np.ndarray, np.ndarray]:
+    """Gamma (shape, rate) per arm, in `keys` order."""
+    agg = [(variants.get(k) or {}).get("score_agg") or {} for k in keys]
+    impr = np.array([float(a.get("impressions", 0.0)) for a in agg])
+    out = np.array([float(a.get("outbound_clicks", 0.0)) for a in agg])
+    pooled = out.sum() / impr.sum() if impr.sum() > 0 else 0.0
+    return 1.0 + prior_impressions * pooled + out, prior_impressions + impr
+
+
+def thompson(variants: dict, keys: List[str], prior_impressions: float = 200.0, seed: int = 0) -> dict:
+    """Sampled arm plus a posterior summary per arm (per-1k mean, 90% interval, P(best))."""
+    shape, rate = posteriors(variants, keys, prior_impressions)
+    rng = np.random.default_rng(seed)
+    sampled = keys[int(np.argmax(rng.gamma(shape, 1.0 / rate)))]
+
+    draws = rng.gamma(shape, 1.0 / rate, size=(SUMMARY_DRAWS, len(keys)))
+    p_best = np.bincount(draws.argmax(axis=1), minlength=len(keys)) / SUMMARY_DRAWS
+    lo, hi = np.quantile(draws, [0.05, 0.95], axis=0)
+    arms = [
+        {
+            "variant_key": k,
+            "alpha": round(float(shape[n]), 3),
+            "beta": round(float(rate[n]), 1),
+            "mean_per_1k": round(1000.0 * float(shape[n] / rate[n]), 3),
+            "lo_per_1k": round(1000.0 * float(lo[n]), 3),
+            "hi_per_1k": round(1000.0 * float(hi[n]), 3),
+            "p_best": round(float(p_best[n]), 3),
+        }
+        for n, k in enumerate(keys)
+    ]
+    return {"sampled": sampled, "prior_impressions": prior_impressions, "arms": arms}
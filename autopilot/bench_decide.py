@@ -0,0 +1,65 @@
+# autopilot/bench_decide.py
+"""Per-call cost of decision.decide() on the real state.
+
+Calls decide() for every recorded cycle's inputs (impressions, intent scores,
+can_change) against the page state in state.json, prepared the way run.py
+hands it over (running aggregates built), checks that the state was not
+mutated, and fails when the mean call is over the budget.
+
+    python -m autopilot.bench_decide        (DECIDE_BENCH_CALLS, DECIDE_BUDGET_US)
+"""
+from __future__ import annotations
+
+import copy
+import os
+import time
+
+from autopilot.config import load_config
+from autopilot.cycle_log import iter_records
+from autopilot.decision import DecisionParams, decide
+from autopilot.scoring import ensure_aggregates
+from autopilot.state_store import load_state
+from autopilot.templates import build_templates
+
+CYCLES_PATH = "autopilot/logs/cycles.jsonl"
+
+
+def main():
+    cfg = load_config()
+    page = cfg.get("html_path")
+    calls = int(os.getenv("DECIDE_BENCH_CALLS", "100000"))
+    budget_us = float(os.getenv("DECIDE_BUDGET_US", "50"))
+
+    state = load_state()
+    ps = (state.get("pages") or {}).get(page) or state
+    # run.py's record_observation builds the running totals before decide() sees the state
+    ensure_aggregates(ps)
+    params = DecisionParams.from_config(cfg)
+    pool_sizes = {i: len(t) for i, t in build_templates(topic="", city="", year="").items()}
+    inputs = [
+        (float((c.get("metrics") or {}).get("impressions", 0.0)), c.get("intent_scores") or {}, bool(c.get("can_change", True)))
+        for c in iter_records(CYCLES_PATH, where=lambda r: r.get("page", page) == page)
+    ] or [(500.0, {}, True)]
+
+    before = copy.deepcopy(ps)
+    actions: dict = {}
+    for impr, scores, can in inputs:
+        a = decide(ps, impr, scores, pool_sizes, params, can)["action"]
+        actions[a] = actions.get(a, 0) + 1
+    if ps != before:
+        raise SystemExit("[BENCH] decide() mutated the state")
+
+    n = len(inputs)
+    t0 = time.perf_counter()
+    for k in range(calls):
+        impr, scores, can = inputs[k % n]
+        decide(ps, impr, scores, pool_sizes, params, can)
+    per_call_us = 1e6 * (time.perf_counter() - t0) / calls
+
+    print(f"[BENCH] decide(): {calls} calls, {per_call_us:.2f} us/call (budget {budget_us:g} us), variants={len(ps.get('variants') or {})} inputs={n} actions={actions}")
+    if per_call_us > budget_us:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
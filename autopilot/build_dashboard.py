@@ -1,26 +1,160 @@
 # autopilot/build_dashboard.py
 from __future__ import annotations
 
+import filecmp
+import hashlib
 import json
 import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 
-def _read_jsonl(path: str) -> List[Dict[str, Any]]:
-    if not os.path.exists(path):
-        return []
-    out = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                out.append(json.loads(line))
-            except Exception:
-                continue
-    return out
+from autopilot.cycle_log import iter_file, read_tail, segment_files
+from autopilot.replay import now_utc
+
+TAIL_CYCLES = 30
+
+STATIC_SENTINEL = "AUTOPILOT_DASHBOARD_STATIC_V1"
+FINGERPRINT_MARK = "AUTOPILOT_DASHBOARD_FP:"
+HEAD_BYTES = 4096
+# Bump when the rendered layout changes, so unchanged inputs still re-render once.
+DASHBOARD_VERSION = 6
+# Per-run bookkeeping (timestamps, timings) differs on every run: it is left out of the
+# fingerprint, so only metrics/decisions force a re-render. What the page shows of it
+# (last cycle time, staleness, stage latency) sits in LIVE_MARK fragments, which are
+# refreshed in place on every build (see _patch_live).
+VOLATILE_KEYS = ("timestamp_utc", "stage_timings", "fetch_timings", "econ_ts_parse")
+LIVE_MARK = "AUTOPILOT_DASHBOARD_LIVE"
+_LIVE_RE = re.compile(rf"<!-- {LIVE_MARK}:([\w-]+) -->.*?<!-- /{LIVE_MARK}:\1 -->", re.DOTALL)
+# Multi-page layout under the dashboard dir: site-wide index + pages/<slug>.html
+SITE_INDEX = "site.html"
+PAGES_SUBDIR = "pages"
+# Full-history trends: LTTB-downsampled to a fixed point count (inline SVG / JSON feed)
+SPARK_POINTS = 60
+FEED_POINTS = 500
+# The feed is an index (<base>.data.json) over one chunk per log segment
+# (<base>.data.<segment>.json, written once) plus the active file's chunk
+# (<base>.data.active.json); each chunk's series is kept in the index.
+FEED_SUFFIX = ".data.json"
+FEED_ACTIVE = "active"
+CHUNK_POINTS = 100
+SERIES_METRICS = ("outbound_per_1k_impr", "outbound_clicks", "impressions", "gsc_clicks")
+FEED_COLUMNS = ["timestamp_utc", "window_start", "window_end", "action", "variant_key",
+                "impressions", "gsc_clicks", "outbound_clicks", "outbound_per_1k_impr", "gsc_ctr", "gsc_position"]
+
+KPIS = [
+    ("Impressions", "impressions", 0),
+    ("GSC Clicks", "gsc_clicks", 0),
+    ("Outbound clicks", "outbound_clicks", 0),
+    ("Outbound / 1k impr", "outbound_per_1k_impr", 2),
+    ("CTR", "gsc_ctr", 4),
+    ("Avg position", "gsc_position", 2),
+]
+
+_STYLE = """\
+    :root {
+      color-scheme: light dark;
+      --bg: #0b1020;
+      --card: rgba(255,255,255,0.06);
+      --border: rgba(255,255,255,0.12);
+      --text: rgba(255,255,255,0.92);
+      --muted: rgba(255,255,255,0.7);
+    }
+    body {
+      margin: 0;
+      font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif;
+      background: var(--bg);
+      color: var(--text);
+    }
+    header {
+      padding: 18px 20px;
+      border-bottom: 1px solid var(--border);
+      display: flex;
+      justify-content: space-between;
+      align-items: baseline;
+      gap: 14px;
+      flex-wrap: wrap;
+    }
+    h1 { font-size: 18px; margin: 0; }
+    .sub { color: var(--muted); font-size: 13px; }
+    .wrap { padding: 20px; max-width: 1100px; margin: 0 auto; }
+    .cards {
+      display: grid;
+      grid-template-columns: repeat(3, minmax(0, 1fr));
+      gap: 12px;
+    }
+    @media (max-width: 900px) {
+      .cards { grid-template-columns: repeat(2, minmax(0, 1fr)); }
+    }
+    @media (max-width: 600px) {
+      .cards { grid-template-columns: 1fr; }
+    }
+    .card {
+      background: var(--card);
+      border: 1px solid var(--border);
+      border-radius: 14px;
+      padding: 12px 14px;
+    }
+    .kpi-label { color: var(--muted); font-size: 12px; }
+    .kpi-val { font-size: 26px; margin-top: 4px; }
+    .kpi-delta { color: var(--muted); font-size: 12px; margin-top: 2px; }
+    .mono { font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, monospace; font-size: 12px; }
+    .section-title { margin: 18px 0 10px; font-size: 14px; color: var(--muted); }
+    table {
+      width: 100%;
+      border-collapse: collapse;
+      background: var(--card);
+      border: 1px solid var(--border);
+      border-radius: 14px;
+      overflow: hidden;
+    }
+    th, td {
+      padding: 10px 10px;
+      border-bottom: 1px solid var(--border);
+      text-align: left;
+      font-size: 13px;
+      vertical-align: top;
+    }
+    th { color: var(--muted); font-weight: 600; background: rgba(255,255,255,0.03); }
+    tr:last-child td { border-bottom: none; }
+    .best td { outline: 1px solid rgba(255,255,255,0.25); }
+    .trend {
+      display: grid;
+      grid-template-columns: repeat(3, minmax(0, 1fr));
+      gap: 12px;
+      margin-top: 12px;
+    }
+    @media (max-width: 900px) {
+      .trend { grid-template-columns: 1fr; }
+    }
+    .trend-item {
+      background: var(--card);
+      border: 1px solid var(--border);
+      border-radius: 14px;
+      padding: 10px 12px;
+    }
+    .trend-title { color: var(--muted); font-size: 12px; margin-bottom: 6px; }
+    .spark { color: rgba(255,255,255,0.9); }
+    .warn {
+      margin: 12px 0;
+      padding: 10px 12px;
+      border-radius: 12px;
+      border: 1px solid rgba(255,170,0,0.5);
+      background: rgba(255,170,0,0.10);
+      color: rgba(255,255,255,0.9);
+    }
+    .meta {
+      margin-top: 10px;
+      color: var(--muted);
+      font-size: 13px;
+      line-height: 1.4;
+    }
+    .meta strong { color: var(--text); }
+"""
 
 
 def _read_json(path: str) -> Optional[Dict[str, Any]]:
@@ -30,6 +164,20 @@ def _read_json(path: str) -> Optional[Dict[str, Any]]:
         return json.load(f)
 
 
+def _read_head(path: str, n: int = HEAD_BYTES) -> str:
+    """First `n` bytes of a text file ('' if missing); enough for sentinel/fingerprint checks."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(n).decode("utf-8", errors="ignore")
+    except FileNotFoundError:
+        return ""
+
+
+def _fingerprint(inputs: Dict[str, Any]) -> str:
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
 def _fmt(x: Any, nd: int = 2) -> str:
     if x is None:
         return "-"
@@ -70,61 +218,171 @@ def _spark(values: List[float], width: int = 140, height: int = 28) -> str:
     return f'<svg viewBox="0 0 {width} {height}" width="{width}" height="{height}" aria-hidden="true"><polyline fill="none" stroke="currentColor" stroke-width="2" points="{poly}"/></svg>'
 
 
-def _iso_to_dt(s: str) -> Optional[datetime]:
+def _lttb(xs: Sequence[float], ys: Sequence[float], n_out: int) -> List[Tuple[float, float]]:
+    """Largest-Triangle-Three-Buckets downsampling: keeps first/last point and, per
+    bucket, the point forming the largest triangle with its neighbours."""
+    n = len(xs)
+    if n_out >= n or n_out < 3:
+        return list(zip(xs, ys))
+    x = np.asarray(xs, dtype="float64")
+    y = np.asarray(ys, dtype="float64")
+    every = (n - 2) / (n_out - 2)
+    keep = [0]
+    a = 0
+    for i in range(n_out - 2):
+        s, e = int(i * every) + 1, int((i + 1) * every) + 1
+        ns, ne = e, min(int((i + 2) * every) + 1, n)
+        if ns >= n - 1:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x, avg_y = x[ns:ne].mean(), y[ns:ne].mean()
+        area = np.abs((x[a] - avg_x) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (avg_y - y[a]))
+        a = s + int(area.argmax())
+        keep.append(a)
+    keep.append(n - 1)
+    return [(float(x[i]), float(y[i])) for i in keep]
+
+
+def _spark_xy(points: List[Tuple[float, float]], width: int = 140, height: int = 28) -> str:
+    """Like _spark, but x is placed by time (points may be unevenly spaced after LTTB)."""
+    if len(points) < 2:
+        return ""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    x0, x1 = min(xs), max(xs)
+    mn, mx = min(ys), max(ys)
+    if x1 == x0:
+        x1 = x0 + 1.0  # epoch seconds: 1e-9 is lost to rounding
+    if mx == mn:
+        mx = mn + 1e-9
+    poly = " ".join(
+        f"{int((x - x0) / (x1 - x0) * (width - 2)) + 1},{int((1 - (y - mn) / (mx - mn)) * (height - 2)) + 1}"
+        for x, y in points
+    )
+    return f'<svg viewBox="0 0 {width} {height}" width="{width}" height="{height}" aria-hidden="true"><polyline fill="none" stroke="currentColor" stroke-width="2" points="{poly}"/></svg>'
+
+
+def _feed_row(c: Dict[str, Any]) -> List[Any]:
+    """One cycle as a FEED_COLUMNS row (what the full history keeps of each record)."""
+    m = c.get("metrics") or {}
+    w = c.get("window") or {}
+    return [
+        c.get("timestamp_utc"), w.get("start"), w.get("end"), c.get("action"),
+        (c.get("chosen") or {}).get("variant_key"),
+    ] + [_metric(m, k) for k in FEED_COLUMNS[5:]]
+
+
+def _series(history: List[List[Any]], n_out: int) -> Dict[str, List[Tuple[float, float]]]:
+    """Downsampled (epoch seconds, value) series per SERIES_METRICS from feed rows."""
+    ts, rows = [], []
+    for r in history:
+        dt = _iso_to_dt(r[0] or "")
+        if dt is not None:
+            ts.append(dt.timestamp())
+            rows.append(r)
+    return {k: _lttb(ts, [r[FEED_COLUMNS.index(k)] for r in rows], n_out) for k in SERIES_METRICS}
+
+
+def _series_json(series: Dict[str, List[Tuple[float, float]]]) -> Dict[str, Dict[str, List[float]]]:
+    return {k: {"t": [int(t) for t, _ in pts], "v": [round(v, 4) for _, v in pts]} for k, pts in series.items()}
+
+
+def _feed_path(output_html: str) -> str:
+    return os.path.splitext(output_html)[0] + FEED_SUFFIX
+
+
+def _chunk_path(feed_path: str, name: str) -> str:
+    """<base>.data.json -> <base>.data.<name>.json"""
+    return feed_path[: -len(".json")] + f".{name}.json"
+
+
+def _segment_name(fp: str) -> str:
+    """Segment id of a rotated log file: "logs/cycles.000001.jsonl" -> "000001"."""
+    return os.path.splitext(os.path.basename(fp))[0].rsplit(".", 1)[-1]
+
+
+def _load_feed(path: str) -> Dict[str, Any]:
+    """Existing feed index; an empty one when missing or in another format (rebuilt from the log)."""
     try:
-        if s.endswith("Z"):
-            s = s.replace("Z", "+00:00")
-        return datetime.fromisoformat(s).astimezone(timezone.utc)
-    except Exception:
-        return None
+        feed = _read_json(path)
+    except ValueError:
+        feed = None
+    if not feed or feed.get("columns") != FEED_COLUMNS or "chunks" not in feed:
+        return {"chunks": []}
+    return feed
 
 
-def build_dashboard(
-    cycles_path: str = "autopilot/logs/cycles.jsonl",
-    state_path: str = "autopilot/state.json",
-    output_html: str = "dashboard/index.html",
-    output_md: str = "autopilot/logs/latest_cycle.md",
-) -> None:
-    cycles = _read_jsonl(cycles_path)
-    state = _read_json(state_path) or {}
+def _plan_feeds(cycles_path: str, feeds: Dict[Optional[str], str]) -> Dict[Optional[str], Dict[str, Any]]:
+    """Rows to write per feed ({page: index path}; page None = every record).
 
-    latest = cycles[-1] if cycles else {}
-    prev = cycles[-2] if len(cycles) >= 2 else {}
+    Only log segments that a feed has no chunk for yet are read, plus the active
+    file; each file is read once for all feeds.
+    """
+    segments = segment_files(cycles_path)
+    plans: Dict[Optional[str], Dict[str, Any]] = {}
+    for page, path in feeds.items():
+        old = _load_feed(path)
+        done = {c["segment"] for c in old["chunks"]}
+        new = {_segment_name(fp): [] for fp in segments if _segment_name(fp) not in done}
+        new[FEED_ACTIVE] = []
+        plans[page] = {"path": path, "page": page, "old": old, "new": new}
+    for fp in segments + [cycles_path]:
+        name = FEED_ACTIVE if fp == cycles_path else _segment_name(fp)
+        readers = [p for p, plan in plans.items() if name in plan["new"]]
+        if not readers:
+            continue
+        for c in iter_file(fp):
+            for p in readers:
+                if p is None or c.get("page") == p:
+                    plans[p]["new"][name].append(_feed_row(c))
+    return plans
 
-    m = (latest.get("metrics") or {})
-    mp = (prev.get("metrics") or {})
 
-    def metric(name: str, default: float = 0.0) -> float:
-        try:
-            return float(m.get(name, default))
-        except Exception:
-            return default
-
-    def metric_prev(name: str, default: float = 0.0) -> float:
-        try:
-            return float(mp.get(name, default))
-        except Exception:
-            return default
-
-    kpis = [
-        ("Impressions", "impressions", 0),
-        ("GSC Clicks", "gsc_clicks", 0),
-        ("Outbound clicks", "outbound_clicks", 0),
-        ("Outbound / 1k impr", "outbound_per_1k_impr", 2),
-        ("CTR", "gsc_ctr", 4),
-        ("Avg position", "gsc_position", 2),
-    ]
+def _write_chunk(feed_path: str, name: str, rows: List[List[Any]]) -> Dict[str, Any]:
+    path = _chunk_path(feed_path, name)
+    if rows:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows}, f, ensure_ascii=False, separators=(",", ":"))
+    elif os.path.exists(path):
+        os.remove(path)  # the active file was just rotated
+    return {"segment": name, "file": os.path.basename(path) if rows else None, "rows": len(rows), "series": _series_json(_series(rows, CHUNK_POINTS))}
 
-    # Build trend arrays (last 26 cycles)
-    tail = cycles[-26:]
-    trend = {
-        "impressions": [float((c.get("metrics") or {}).get("impressions", 0.0)) for c in tail],
-        "outbound_per_1k_impr": [float((c.get("metrics") or {}).get("outbound_per_1k_impr", 0.0)) for c in tail],
-        "outbound_clicks": [float((c.get("metrics") or {}).get("outbound_clicks", 0.0)) for c in tail],
-        "gsc_clicks": [float((c.get("metrics") or {}).get("gsc_clicks", 0.0)) for c in tail],
+
+def _write_feed(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Write the new chunks and the index; returns {"rows", "series"} of the whole history."""
+    path = plan["path"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    chunks = [c for c in plan["old"]["chunks"] if c["segment"] != FEED_ACTIVE]
+    chunks += [_write_chunk(path, name, rows) for name, rows in plan["new"].items()]
+    chunks.sort(key=lambda c: (c["segment"] == FEED_ACTIVE, c["segment"]))
+    series = {
+        k: _lttb([t for c in chunks for t in c["series"][k]["t"]], [v for c in chunks for v in c["series"][k]["v"]], FEED_POINTS)
+        for k in SERIES_METRICS
+    }
+    feed = {
+        "page": plan["page"],
+        "columns": FEED_COLUMNS,
+        "rows": sum(c["rows"] for c in chunks),
+        "chunks": chunks,
+        "series": _series_json(series),
     }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(feed, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+    return {"rows": feed["rows"], "series": series}
+
+
+def _iso_to_dt(s: str) -> Optional[datetime]:
+    try:
+        if s.endswith("Z"):
+            s = s.replace("Z", "+00:00")
+        return datetime.fromisoformat(s).astimezone(timezone.utc)
+    except Exception:
+        return None
 
-    # Variant leaderboard
+
+def _leaderboard(state: Dict[str, Any]) -> List[Dict[str, Any]]:
     variants = state.get("variants", {}) or {}
     leaderboard = []
     for k, v in variants.items():
@@ -139,40 +397,261 @@ def build_dashboard(
             "gsc_clicks": float(s.get("gsc_clicks", 0.0)),
         })
     leaderboard.sort(key=lambda r: (r["outbound_per_1k_impr"], r["gsc_clicks"]), reverse=True)
+    return leaderboard
+
+
+def _stable(c: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in c.items() if k not in VOLATILE_KEYS}
+
+
+def _distinct(cycles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fold re-runs: a cycle equal to the one before it (but for VOLATILE_KEYS) replaces it.
+
+    Every run appends a cycle per page; one that brings no new metrics or
+    decision must not change the dashboard's fingerprint. The latest record of
+    a folded run is kept, so its timestamp and timings are the current ones.
+    """
+    out: List[Dict[str, Any]] = []
+    for c in cycles:
+        if out and _stable(out[-1]) == _stable(c):
+            out[-1] = c
+        else:
+            out.append(c)
+    return out
+
+
+def _live(name: str, body: str) -> str:
+    return f"<!-- {LIVE_MARK}:{name} -->{body}<!-- /{LIVE_MARK}:{name} -->"
+
+
+def _patch_live(path: Optional[str], fragments: Dict[str, str]) -> bool:
+    """Refresh the live fragments of an output whose fingerprinted body is up to date; True when it changed."""
+    if not path or not os.path.exists(path):
+        return False
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    new = _LIVE_RE.sub(lambda m: _live(m.group(1), fragments[m.group(1)]) if m.group(1) in fragments else m.group(0), text)
+    if new == text:
+        return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(new)
+    return True
+
+
+def _stale_days(latest: Dict[str, Any]) -> Optional[int]:
+    last_ts = _iso_to_dt(latest.get("timestamp_utc", "")) if latest else None
+    return (now_utc() - last_ts).days if last_ts else None
+
+
+def _plan_page(
+    cycles: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    output_html: str,
+    output_md: Optional[str],
+    config: Optional[Dict[str, Any]] = None,
+    page: Optional[str] = None,
+    index_href: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Render job for one dashboard, or None when its outputs are already up to date."""
+    leaderboard = _leaderboard(state)
     best_key = state.get("best_variant_key")
+    stale_days = _stale_days(cycles[-1] if cycles else {})
+
+    # ---- Skip when inputs are unchanged; never overwrite a static dashboard ----
+    fp = _fingerprint({
+        "version": DASHBOARD_VERSION,
+        "page": page,
+        "index_href": index_href,
+        "cycles": [_stable(c) for c in cycles],
+        "leaderboard": leaderboard,
+        "best_variant_key": best_key,
+        "config": config or {},
+    })
+    fp_line = f"<!-- {FINGERPRINT_MARK}{fp} -->"
+    html_head = _read_head(output_html)
+    html_static = STATIC_SENTINEL in html_head
+    write_html = not html_static and fp_line not in html_head
+    write_md = bool(output_md) and fp_line not in _read_head(output_md)
+    if html_static:
+        print(f"[DASHBOARD] Static dashboard detected ({output_html}). Skipping overwrite.")
+    latest = cycles[-1] if cycles else {}
+    refreshed = False
+    if not write_html and not html_static:
+        refreshed |= _patch_live(output_html, _live_html(cycles, stale_days))
+    if not write_md:
+        refreshed |= _patch_live(output_md, _live_md(latest))
+    if not write_html and not write_md:
+        print(f"[DASHBOARD] Inputs unchanged ({fp}). Skipping render of {output_html}{' (live fields refreshed)' if refreshed else ''}.")
+        return None
+    return {
+        "cycles": cycles,
+        "leaderboard": leaderboard,
+        "best_key": best_key,
+        "stale_days": stale_days,
+        "page": page,
+        "index_href": index_href,
+        "fp_line": fp_line,
+        "output_html": output_html if write_html else None,
+        "output_md": output_md if write_md else None,
+    }
+
+
+def _write_page(job: Dict[str, Any]) -> str:
+    """Render and write one dashboard job (top-level so it can run in a worker process)."""
+    cycles = job["cycles"]
+    latest = cycles[-1] if cycles else {}
+    if job["output_md"]:
+        os.makedirs(os.path.dirname(job["output_md"]) or ".", exist_ok=True)
+        with open(job["output_md"], "w", encoding="utf-8") as f:
+            f.write(_render_page_md(latest, job["best_key"], job["fp_line"]))
+    if job["output_html"]:
+        os.makedirs(os.path.dirname(job["output_html"]) or ".", exist_ok=True)
+        with open(job["output_html"], "w", encoding="utf-8") as f:
+            f.write(_render_page_html(job, job["feed"], os.path.basename(_feed_path(job["output_html"]))))
+    return job["output_html"] or job["output_md"]
+
+
+def _metric(m: Dict[str, Any], name: str, default: float = 0.0) -> float:
+    try:
+        return float(m.get(name, default))
+    except Exception:
+        return default
+
+
+def _stage_rows(cycles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-stage latency over the cycle tail (from each cycle's stage_timings)."""
+    timed = [c for c in cycles if (c.get("stage_timings") or {}).get("spans")]
+    if not timed:
+        return []
+    names: List[str] = []
+    for c in timed:
+        for sp in c["stage_timings"]["spans"]:
+            if sp["name"] not in names:
+                names.append(sp["name"])
+    latest = {sp["name"]: sp for sp in timed[-1]["stage_timings"]["spans"]}
+    rows = []
+    for name in names:
+        walls = []
+        for c in timed:
+            sp = next((x for x in c["stage_timings"]["spans"] if x["name"] == name), None)
+            walls.append(float(sp["wall_seconds"]) if sp else 0.0)
+        cur = latest.get(name) or {}
+        rows.append({
+            "name": name,
+            "wall": cur.get("wall_seconds"),
+            "median": float(np.median(walls)),
+            "cpu": cur.get("cpu_seconds"),
+            "peak_mem_kb": cur.get("peak_mem_kb"),
+            "rows": cur.get("rows"),
+            "walls": walls,
+        })
+    return rows
 
-    # Health checks
-    now = datetime.now(timezone.utc)
+
+def _seq_test_txt(t: Dict[str, Any]) -> str:
+    return (f"SPRT {t.get('current','-')} vs {t.get('best','-')} ({t.get('windows_cur',0)} vs {t.get('windows_best',0)} windows): llr={_fmt(t.get('llr',0.0),3)} "
+            f"(keep ≤ {_fmt(t.get('lower',0.0),2)}, rollback ≥ {_fmt(t.get('upper',0.0),2)}) → {t.get('decision','-')}")
+
+
+def _live_md(latest: Dict[str, Any]) -> Dict[str, str]:
+    return {"timestamp": str(latest.get("timestamp_utc", "-"))}
+
+
+def _render_page_md(latest: Dict[str, Any], best_key: Optional[str], fp_line: str) -> str:
+    m = (latest.get("metrics") or {})
+    lines = [
+        fp_line,
+        "# Autopilot latest cycle",
+        "",
+        f"- Timestamp (UTC): {_live('timestamp', _live_md(latest)['timestamp'])}",
+        f"- Window: {latest.get('window',{}).get('start','-')} → {latest.get('window',{}).get('end','-')}",
+        f"- Action: **{latest.get('action','-')}**",
+        f"- Active variant: `{(latest.get('chosen') or {}).get('variant_key','-')}`",
+        f"- Best variant: `{best_key or '-'}`",
+        "",
+        "## KPIs (latest window)",
+    ]
+    lines += [f"- {label}: {_fmt(_metric(m, key), nd)}" for label, key, nd in KPIS]
+    if latest.get("sequential_test"):
+        lines += ["", f"- Rollback test: {_seq_test_txt(latest['sequential_test'])}"]
+    arms = (latest.get("bandit") or {}).get("arms") or []
+    if arms:
+        lines += ["", "## Bandit posteriors (outbound/1k: mean [90%], P(best))"]
+        lines += [f"- `{r['variant_key']}`: {_fmt(r['mean_per_1k'], 2)} [{_fmt(r['lo_per_1k'], 2)}–{_fmt(r['hi_per_1k'], 2)}], {_fmt(100.0 * r['p_best'], 1)}%" for r in sorted(arms, key=lambda r: r["p_best"], reverse=True)]
+    return "\n".join(lines) + "\n"
+
+
+def _live_html(cycles: List[Dict[str, Any]], stale_days: Optional[int]) -> Dict[str, str]:
+    """Page parts that follow the latest run, not the fingerprinted inputs (see LIVE_MARK)."""
+    latest = cycles[-1] if cycles else {}
     last_ts = _iso_to_dt(latest.get("timestamp_utc", "")) if latest else None
-    stale_days = None
-    if last_ts:
-        stale_days = (now - last_ts).days
-
-    next_eta = None
-    if last_ts:
-        next_eta = last_ts + timedelta(days=7)
-    else:
-        next_eta = now + timedelta(days=7)
-
-    # Build MD summary
-    os.makedirs(os.path.dirname(output_md) or ".", exist_ok=True)
-    with open(output_md, "w", encoding="utf-8") as fmd:
-        fmd.write(f"# Autopilot latest cycle\n\n")
-        fmd.write(f"- Timestamp (UTC): {latest.get('timestamp_utc','-')}\n")
-        fmd.write(f"- Window: {latest.get('window',{}).get('start','-')} → {latest.get('window',{}).get('end','-')}\n")
-        fmd.write(f"- Action: **{latest.get('action','-')}**\n")
-        fmd.write(f"- Active variant: `{(latest.get('chosen') or {}).get('variant_key','-')}`\n")
-        fmd.write(f"- Best variant: `{best_key or '-'}`\n")
-        fmd.write("\n## KPIs (latest window)\n")
-        for label, key, nd in kpis:
-            fmd.write(f"- {label}: {_fmt(metric(key), nd)}\n")
-
-    # HTML dashboard
-    os.makedirs(os.path.dirname(output_html) or ".", exist_ok=True)
+    next_eta = (last_ts or now_utc()) + timedelta(days=7)
+    last_cycle = f'Last cycle: <span class="mono">{latest.get("timestamp_utc","-")}</span> · Next ETA (approx): <span class="mono">{next_eta.isoformat().replace("+00:00","Z")}</span>'
+
+    # Per-stage latency (wall seconds per cycle over the tail)
+    stage_html = ""
+    stages = _stage_rows(cycles)
+    if stages:
+        stage_trs = ""
+        for r in stages:
+            stage_trs += f"""
+        <tr>
+          <td class="mono">{r["name"]}</td>
+          <td>{_fmt(r["wall"],3)}</td>
+          <td>{_fmt(r["median"],3)}</td>
+          <td>{_fmt(r["cpu"],3)}</td>
+          <td>{_fmt(r["peak_mem_kb"],0)}</td>
+          <td>{_fmt(r["rows"],0)}</td>
+          <td class="spark">{_spark(r["walls"], width=120, height=20)}</td>
+        </tr>
+        """
+        stage_html = f"""
+    <div class="section-title">Stage latency (latest {len(stages[0]["walls"])} timed cycles)</div>
+    <table>
+      <thead>
+        <tr>
+          <th>Stage</th><th>Wall s</th><th>Median wall s</th><th>CPU s</th><th>Peak mem KB</th><th>Rows</th><th>Wall trend</th>
+        </tr>
+      </thead>
+      <tbody>
+        {stage_trs}
+      </tbody>
+    </table>
+    """
+
+    warn = ""
+    if stale_days is not None and stale_days >= 14:
+        warn = f'<div class="warn">⚠️ Latest cycle is {stale_days} days old. Autopilot may be broken or schedule paused.</div>'
+
+    return {"last_cycle": last_cycle, "warn": warn, "stages": stage_html}
+
+
+def _render_page_html(job: Dict[str, Any], feed: Dict[str, Any], feed_href: str) -> str:
+    cycles = job["cycles"]
+    leaderboard = job["leaderboard"]
+    best_key = job["best_key"]
+    stale_days = job["stale_days"]
+    fp_line = job["fp_line"]
+
+    latest = cycles[-1] if cycles else {}
+    prev = cycles[-2] if len(cycles) >= 2 else {}
+    m = (latest.get("metrics") or {})
+    mp = (prev.get("metrics") or {})
+
+    live = _live_html(cycles, stale_days)
+
+    # Build trend arrays (last 26 cycles)
+    tail = cycles[-26:]
+    trend = {
+        "impressions": [float((c.get("metrics") or {}).get("impressions", 0.0)) for c in tail],
+        "outbound_per_1k_impr": [float((c.get("metrics") or {}).get("outbound_per_1k_impr", 0.0)) for c in tail],
+        "outbound_clicks": [float((c.get("metrics") or {}).get("outbound_clicks", 0.0)) for c in tail],
+        "gsc_clicks": [float((c.get("metrics") or {}).get("gsc_clicks", 0.0)) for c in tail],
+    }
 
     def card(label: str, key: str, nd: int) -> str:
-        cur = metric(key)
-        prv = metric_prev(key)
+        cur = _metric(m, key)
+        prv = _metric(mp, key)
         d = _pct_change(cur, prv)
         d_txt = "—" if d is None else f"{d*100:+.1f}%"
         return f"""
@@ -183,7 +662,7 @@ def build_dashboard(
         </div>
         """
 
-    kpi_cards = "\n".join(card(*k) for k in kpis)
+    kpi_cards = "\n".join(card(*k) for k in KPIS)
 
     trend_row = f"""
       <div class="trend">
@@ -202,6 +681,26 @@ def build_dashboard(
       </div>
     """
 
+    # Full history, downsampled; the JSON feed holds the denser series for the charts
+    long = {k: _lttb([t for t, _ in pts], [v for _, v in pts], SPARK_POINTS) for k, pts in feed["series"].items()}
+    long_row = f"""
+      <div class="section-title">Full history ({feed["rows"]} cycles, downsampled)</div>
+      <div class="trend" id="long-trend">
+        <div class="trend-item">
+          <div class="trend-title">Outbound / 1k impr</div>
+          <div class="spark" data-series="outbound_per_1k_impr">{_spark_xy(long["outbound_per_1k_impr"])}</div>
+        </div>
+        <div class="trend-item">
+          <div class="trend-title">Outbound clicks</div>
+          <div class="spark" data-series="outbound_clicks">{_spark_xy(long["outbound_clicks"])}</div>
+        </div>
+        <div class="trend-item">
+          <div class="trend-title">Impressions</div>
+          <div class="spark" data-series="impressions">{_spark_xy(long["impressions"])}</div>
+        </div>
+      </div>
+    """
+
     # Cycles table
     def row(c: Dict[str, Any]) -> str:
         mm = c.get("metrics") or {}
@@ -224,9 +723,8 @@ def build_dashboard(
         </tr>
         """
 
-    cycles_rows = "\n".join(row(c) for c in cycles[-30:][::-1])
+    cycles_rows = "\n".join(row(c) for c in cycles[-TAIL_CYCLES:][::-1])
 
-    
     # Top queries rows (latest cycle)
     topq = latest.get("top_queries") or []
     topq_rows = ""
@@ -239,7 +737,7 @@ def build_dashboard(
           <td>{_fmt(q.get('position',0.0),2)}</td>
         </tr>"""
 
-# Leaderboard table
+    # Leaderboard table
     lb_rows = ""
     for r in leaderboard[:12]:
         cls = "best" if r["variant_key"] == best_key else ""
@@ -255,11 +753,45 @@ def build_dashboard(
         </tr>
         """
 
-    warn = ""
-    if stale_days is not None and stale_days >= 14:
-        warn = f'<div class="warn">⚠️ Latest cycle is {stale_days} days old. Autopilot may be broken or schedule paused.</div>'
+    seq_html = ""
+    if latest.get("sequential_test"):
+        seq_html = f'<div><strong>Rollback test:</strong> <span class="mono">{_seq_test_txt(latest["sequential_test"])}</span></div>'
+
+    # Bandit posteriors (latest cycle, selection_mode "thompson")
+    bandit_html = ""
+    bandit = latest.get("bandit") or {}
+    if bandit.get("arms"):
+        arm_trs = ""
+        for r in sorted(bandit["arms"], key=lambda r: r["p_best"], reverse=True):
+            cls = "best" if r["variant_key"] == bandit.get("sampled") else ""
+            arm_trs += f"""
+        <tr class="{cls}">
+          <td class="mono">{r["variant_key"]}</td>
+          <td>{_fmt(r["mean_per_1k"],2)}</td>
+          <td>{_fmt(r["lo_per_1k"],2)} – {_fmt(r["hi_per_1k"],2)}</td>
+          <td>{_fmt(100.0 * r["p_best"],1)}%</td>
+          <td>{_fmt(r["alpha"],1)} / {_fmt(r["beta"],0)}</td>
+        </tr>
+        """
+        bandit_html = f"""
+    <div class="section-title">Bandit posteriors (latest cycle) · sampled <span class="mono">{bandit.get("sampled","-")}</span></div>
+    <table>
+      <thead>
+        <tr>
+          <th>Variant</th><th>Posterior mean outbound/1k</th><th>90% interval</th><th>P(best)</th><th>Gamma shape / rate</th>
+        </tr>
+      </thead>
+      <tbody>
+        {arm_trs}
+      </tbody>
+    </table>
+    """
+
+    page_txt = f' · <span class="mono">{job["page"]}</span>' if job.get("page") else ""
+    nav = f'<div class="meta"><a href="{job["index_href"]}">← All pages</a></div>' if job.get("index_href") else ""
 
-    html = f"""<!doctype html>
+    html = f"""{fp_line}
+<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8"/>
@@ -267,111 +799,14 @@ def build_dashboard(
   <meta name="robots" content="noindex,nofollow"/>
   <title>Seine.travel Autopilot Dashboard</title>
   <style>
-    :root {{
-      color-scheme: light dark;
-      --bg: #0b1020;
-      --card: rgba(255,255,255,0.06);
-      --border: rgba(255,255,255,0.12);
-      --text: rgba(255,255,255,0.92);
-      --muted: rgba(255,255,255,0.7);
-    }}
-    body {{
-      margin: 0;
-      font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif;
-      background: var(--bg);
-      color: var(--text);
-    }}
-    header {{
-      padding: 18px 20px;
-      border-bottom: 1px solid var(--border);
-      display: flex;
-      justify-content: space-between;
-      align-items: baseline;
-      gap: 14px;
-      flex-wrap: wrap;
-    }}
-    h1 {{ font-size: 18px; margin: 0; }}
-    .sub {{ color: var(--muted); font-size: 13px; }}
-    .wrap {{ padding: 20px; max-width: 1100px; margin: 0 auto; }}
-    .cards {{
-      display: grid;
-      grid-template-columns: repeat(3, minmax(0, 1fr));
-      gap: 12px;
-    }}
-    @media (max-width: 900px) {{
-      .cards {{ grid-template-columns: repeat(2, minmax(0, 1fr)); }}
-    }}
-    @media (max-width: 600px) {{
-      .cards {{ grid-template-columns: 1fr; }}
-    }}
-    .card {{
-      background: var(--card);
-      border: 1px solid var(--border);
-      border-radius: 14px;
-      padding: 12px 14px;
-    }}
-    .kpi-label {{ color: var(--muted); font-size: 12px; }}
-    .kpi-val {{ font-size: 26px; margin-top: 4px; }}
-    .kpi-delta {{ color: var(--muted); font-size: 12px; margin-top: 2px; }}
-    .mono {{ font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, monospace; font-size: 12px; }}
-    .section-title {{ margin: 18px 0 10px; font-size: 14px; color: var(--muted); }}
-    table {{
-      width: 100%;
-      border-collapse: collapse;
-      background: var(--card);
-      border: 1px solid var(--border);
-      border-radius: 14px;
-      overflow: hidden;
-    }}
-    th, td {{
-      padding: 10px 10px;
-      border-bottom: 1px solid var(--border);
-      text-align: left;
-      font-size: 13px;
-      vertical-align: top;
-    }}
-    th {{ color: var(--muted); font-weight: 600; background: rgba(255,255,255,0.03); }}
-    tr:last-child td {{ border-bottom: none; }}
-    .best td {{ outline: 1px solid rgba(255,255,255,0.25); }}
-    .trend {{
-      display: grid;
-      grid-template-columns: repeat(3, minmax(0, 1fr));
-      gap: 12px;
-      margin-top: 12px;
-    }}
-    @media (max-width: 900px) {{
-      .trend {{ grid-template-columns: 1fr; }}
-    }}
-    .trend-item {{
-      background: var(--card);
-      border: 1px solid var(--border);
-      border-radius: 14px;
-      padding: 10px 12px;
-    }}
-    .trend-title {{ color: var(--muted); font-size: 12px; margin-bottom: 6px; }}
-    .spark {{ color: rgba(255,255,255,0.9); }}
-    .warn {{
-      margin: 12px 0;
-      padding: 10px 12px;
-      border-radius: 12px;
-      border: 1px solid rgba(255,170,0,0.5);
-      background: rgba(255,170,0,0.10);
-      color: rgba(255,255,255,0.9);
-    }}
-    .meta {{
-      margin-top: 10px;
-      color: var(--muted);
-      font-size: 13px;
-      line-height: 1.4;
-    }}
-    .meta strong {{ color: var(--text); }}
+{_STYLE}
   </style>
 </head>
 <body>
   <header>
     <div>
-      <h1>Seine.travel — Autopilot Dashboard</h1>
-      <div class="sub">Last cycle: <span class="mono">{latest.get("timestamp_utc","-")}</span> · Next ETA (approx): <span class="mono">{next_eta.isoformat().replace("+00:00","Z")}</span></div>
+      <h1>Seine.travel — Autopilot Dashboard{page_txt}</h1>
+      <div class="sub">{_live("last_cycle", live["last_cycle"])}</div>
     </div>
     <div class="sub">
       Active: <span class="mono">{(latest.get("chosen") or {}).get("variant_key","-")}</span> · Best: <span class="mono">{best_key or "-"}</span> · Action: <strong>{latest.get("action","-")}</strong>
@@ -379,17 +814,20 @@ def build_dashboard(
   </header>
 
   <div class="wrap">
-    {warn}
+    {nav}
+    {_live("warn", live["warn"])}
 
     <div class="cards">
       {kpi_cards}
     </div>
 
     {trend_row}
+    {long_row}
 
     <div class="meta">
       <div><strong>Window:</strong> <span class="mono">{(latest.get("window") or {}).get("start","-")}</span> → <span class="mono">{(latest.get("window") or {}).get("end","-")}</span></div>
       <div><strong>Dominant intent (queries):</strong> {latest.get("dominant_intent","-")}</div>
+      {seq_html}
       <div><strong>Chosen title:</strong> {((latest.get("chosen") or {}).get("title")) or "-"}</div>
       <div><strong>Chosen meta:</strong> {((latest.get("chosen") or {}).get("meta")) or "-"}</div>
     </div>
@@ -419,18 +857,22 @@ def build_dashboard(
       </tbody>
     </table>
 
-    <div class="section-title">Cycles (latest 30)</div>
+    {bandit_html}
+
+    <div class="section-title">Cycles (latest {min(len(cycles), TAIL_CYCLES)} of {feed["rows"]}) <button id="load-all" type="button">Load full history</button></div>
     <table>
       <thead>
         <tr>
           <th>Timestamp (UTC)</th><th>Window</th><th>Action</th><th>Variant</th><th>Impr</th><th>GSC clicks</th><th>Outbound</th><th>Outbound/1k</th><th>CTR</th><th>Pos</th>
         </tr>
       </thead>
-      <tbody>
+      <tbody id="cycles-body">
         {cycles_rows}
       </tbody>
     </table>
 
+    {_live("stages", live["stages"])}
+
     <div class="section-title">Notes</div>
     <div class="meta">
       <div>• Dashboard is <strong>noindex</strong> (not meant for SEO).</div>
@@ -438,19 +880,267 @@ def build_dashboard(
       <div>• Rollback triggers when current variant underperforms best variant by configured drop% (and enough data).</div>
     </div>
   </div>
+  <script>
+  // Full table + denser charts come from the JSON feed (index + one chunk per log segment), fetched on demand.
+  (function () {{
+    var btn = document.getElementById("load-all");
+    function fmt(v, nd) {{ return typeof v === "number" ? (Math.abs(v) >= 1000 ? Math.round(v).toLocaleString("en-US") : v.toFixed(nd)) : (v == null ? "-" : String(v)); }}
+    function spark(s, w, h) {{
+      if (!s || s.t.length < 2) return "";
+      var x0 = Math.min.apply(null, s.t), x1 = Math.max.apply(null, s.t) || 1;
+      var mn = Math.min.apply(null, s.v), mx = Math.max.apply(null, s.v);
+      if (x1 === x0) x1 = x0 + 1;
+      if (mx === mn) mx = mn + 1e-9;
+      var pts = s.t.map(function (t, i) {{
+        return Math.round((t - x0) / (x1 - x0) * (w - 2) + 1) + "," + Math.round((1 - (s.v[i] - mn) / (mx - mn)) * (h - 2) + 1);
+      }}).join(" ");
+      return '<svg viewBox="0 0 ' + w + ' ' + h + '" width="100%" height="' + h + '" preserveAspectRatio="none" aria-hidden="true"><polyline fill="none" stroke="currentColor" stroke-width="1.5" points="' + pts + '"/></svg>';
+    }}
+    btn.addEventListener("click", function () {{
+      btn.disabled = true;
+      var base = "{feed_href}".replace(/[^/]*$/, "");
+      function get(href) {{ return fetch(href).then(function (r) {{ return r.json(); }}); }}
+      get("{feed_href}").then(function (feed) {{
+        var files = feed.chunks.filter(function (c) {{ return c.file; }}).map(function (c) {{ return get(base + c.file); }});
+        return Promise.all(files).then(function (chunks) {{
+          feed.rows = [].concat.apply([], chunks.map(function (c) {{ return c.rows; }}));
+          return feed;
+        }});
+      }}).then(function (feed) {{
+        var nd = [0, 0, 0, 2, 4, 2];
+        var rows = feed.rows.slice().reverse().map(function (r) {{
+          var m = r.slice(5).map(function (v, i) {{ return "<td>" + fmt(v, nd[i]) + "</td>"; }}).join("");
+          return '<tr><td class="mono">' + r[0] + '</td><td class="mono">' + r[1] + " → " + r[2] + "</td><td>" + (r[3] || "-") +
+            '</td><td class="mono">' + (r[4] || "-") + "</td>" + m + "</tr>";
+        }});
+        document.getElementById("cycles-body").innerHTML = rows.join("");
+        document.querySelectorAll("#long-trend [data-series]").forEach(function (el) {{
+          el.innerHTML = spark(feed.series[el.getAttribute("data-series")], 600, 60);
+        }});
+        btn.textContent = feed.rows.length + " cycles loaded";
+      }}).catch(function () {{ btn.disabled = false; }});
+    }});
+  }})();
+  </script>
 </body>
 </html>
 """
-    # ---- Guard: do not overwrite a manually maintained static dashboard ----
-    STATIC_SENTINEL = "AUTOPILOT_DASHBOARD_STATIC_V1"
-    try:
-        if os.path.exists(output_html):
-            with open(output_html, "r", encoding="utf-8") as fr:
-                if STATIC_SENTINEL in fr.read():
-                    print("[DASHBOARD] Static dashboard detected. Skipping overwrite.")
-                    return
-    except Exception as e:
-        print(f"[DASHBOARD] Sentinel check failed (will overwrite): {e}")
-
-    with open(output_html, "w", encoding="utf-8") as f:
-        f.write(html)
+    return html
+
+
+def build_dashboard(
+    cycles_path: str = "autopilot/logs/cycles.jsonl",
+    state_path: str = "autopilot/state.json",
+    output_html: str = "dashboard/index.html",
+    output_md: str = "autopilot/logs/latest_cycle.md",
+    page: Optional[str] = None,
+    state_db: Optional[str] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Render the HTML dashboard and MD summary; returns False when nothing was written.
+
+    Both outputs carry a fingerprint of their inputs (cycle tail, variant scores,
+    config) in their first line. When it matches, rendering is skipped. A static
+    dashboard (STATIC_SENTINEL in the file head) is never overwritten.
+    """
+    # Only the shown window is read (tail of the segmented log; twice as long to allow for folded re-runs)
+    cycles = _distinct(read_tail(cycles_path, 2 * TAIL_CYCLES, where=(lambda c: c.get("page") == page) if page else None))[-TAIL_CYCLES:]
+    state = _load_page_states(state_path, state_db, [page] if page else [None])[page]
+
+    job = _plan_page(cycles, state, output_html, output_md, config=config)
+    if job is None:
+        return False
+    if job["output_html"]:
+        job["feed"] = _write_feed(_plan_feeds(cycles_path, {page: _feed_path(job["output_html"])})[page])
+    _write_page(job)
+    return True
+
+
+def page_slug(html_path: str) -> str:
+    """File-name-safe id of a page: "guides/paris.html" -> "guides__paris"."""
+    slug = os.path.splitext(html_path.strip("/"))[0].replace("/", "__")
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", slug) or "index"
+
+
+def _load_page_states(state_path: str, state_db: Optional[str], pages: List[Optional[str]]) -> Dict[Optional[str], Dict[str, Any]]:
+    if state_db:
+        # SQLite backend: read only the variant rows of the requested pages
+        from autopilot.state_db import SqliteStateStore
+        store = SqliteStateStore(state_db)
+        out = {p: (store.load_page(p, history_tail=0) if p else {}) for p in pages}
+        store.close()
+        return out
+    state = _read_json(state_path) or {}
+    # Multi-page mode: per-page state
+    return {p: ((state.get("pages") or {}).get(p) or state) if p else state for p in pages}
+
+
+def _tails_by_page(cycles_path: str, pages: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Cycle tail of every page (re-runs folded, see _distinct) from a single backwards read of the log.
+
+    Each run appends one record per page, so the last 2 * TAIL_CYCLES * len(pages)
+    records hold every page's window.
+    """
+    wanted = set(pages)
+    tail = read_tail(cycles_path, 2 * TAIL_CYCLES * len(pages), where=lambda c: c.get("page") in wanted)
+    out: Dict[str, List[Dict[str, Any]]] = {p: [] for p in pages}
+    for c in tail:
+        out[c["page"]].append(c)
+    return {p: _distinct(cs)[-TAIL_CYCLES:] for p, cs in out.items()}
+
+
+def _site_rows(pages: List[str], tails: Dict[str, List[Dict[str, Any]]], states: Dict[Optional[str], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rows = []
+    for p in pages:
+        latest = tails[p][-1] if tails[p] else {}
+        m = latest.get("metrics") or {}
+        best_key = states[p].get("best_variant_key")
+        best = next((r for r in _leaderboard(states[p]) if r["variant_key"] == best_key), None)
+        stale_days = _stale_days(latest)
+        rows.append({
+            "page": p,
+            "href": f"{PAGES_SUBDIR}/{page_slug(p)}.html",
+            "timestamp_utc": latest.get("timestamp_utc"),
+            "action": latest.get("action"),
+            "active": (latest.get("chosen") or {}).get("variant_key"),
+            "best": best_key,
+            "best_per_1k": best["outbound_per_1k_impr"] if best else None,
+            "impressions": _metric(m, "impressions"),
+            "outbound_clicks": _metric(m, "outbound_clicks"),
+            "outbound_per_1k_impr": _metric(m, "outbound_per_1k_impr"),
+            "stale": stale_days is not None and stale_days >= 14,
+        })
+    rows.sort(key=lambda r: (r["outbound_per_1k_impr"], r["impressions"]), reverse=True)
+    return rows
+
+
+def _render_site_html(rows: List[Dict[str, Any]], fp_line: str) -> str:
+    total_impr = sum(r["impressions"] for r in rows)
+    total_out = sum(r["outbound_clicks"] for r in rows)
+    site_per_1k = 1000.0 * total_out / total_impr if total_impr > 0 else 0.0
+    body = ""
+    for r in rows:
+        body += f"""
+        <tr>
+          <td class="mono"><a href="{r["href"]}">{r["page"]}</a>{" ⚠️" if r["stale"] else ""}</td>
+          <td class="mono">{r["timestamp_utc"] or "-"}</td>
+          <td>{r["action"] or "-"}</td>
+          <td class="mono">{r["active"] or "-"}</td>
+          <td class="mono">{r["best"] or "-"}</td>
+          <td>{_fmt(r["impressions"],0)}</td>
+          <td>{_fmt(r["outbound_clicks"],0)}</td>
+          <td>{_fmt(r["outbound_per_1k_impr"],2)}</td>
+          <td>{_fmt(r["best_per_1k"],2)}</td>
+        </tr>
+        """
+    return f"""{fp_line}
+<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
+  <meta name="robots" content="noindex,nofollow"/>
+  <title>Seine.travel Autopilot — All pages</title>
+  <style>
+{_STYLE}
+  </style>
+</head>
+<body>
+  <header>
+    <div>
+      <h1>Seine.travel — Autopilot, all pages</h1>
+      <div class="sub">{len(rows)} page(s)</div>
+    </div>
+  </header>
+
+  <div class="wrap">
+    <div class="cards">
+      <div class="card"><div class="kpi-label">Impressions (latest windows)</div><div class="kpi-val">{_fmt(total_impr,0)}</div></div>
+      <div class="card"><div class="kpi-label">Outbound clicks (latest windows)</div><div class="kpi-val">{_fmt(total_out,0)}</div></div>
+      <div class="card"><div class="kpi-label">Outbound / 1k impr (site)</div><div class="kpi-val">{_fmt(site_per_1k,2)}</div></div>
+    </div>
+
+    <div class="section-title">Page leaderboard (latest window)</div>
+    <table>
+      <thead>
+        <tr>
+          <th>Page</th><th>Last cycle (UTC)</th><th>Action</th><th>Active</th><th>Best</th><th>Impr</th><th>Outbound</th><th>Outbound/1k</th><th>Best outbound/1k</th>
+        </tr>
+      </thead>
+      <tbody>
+        {body}
+      </tbody>
+    </table>
+  </div>
+</body>
+</html>
+"""
+
+
+def build_dashboards(
+    pages: List[str],
+    cycles_path: str = "autopilot/logs/cycles.jsonl",
+    state_path: str = "autopilot/state.json",
+    output_dir: str = "dashboard",
+    state_db: Optional[str] = None,
+    config: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+    primary: Optional[str] = None,
+    primary_md: Optional[str] = None,
+) -> Dict[str, List[str]]:
+    """One dashboard per page (output_dir/pages/<slug>.html + .md) and a site-wide output_dir/site.html.
+
+    Inputs are read once and fingerprinted in this process; only pages whose
+    fingerprint changed are rendered, as independent jobs on a process pool.
+    `primary_md` (e.g. logs/latest_cycle.md) is kept as a copy of the `primary`
+    page's MD summary rather than rendered again.
+    Returns {"rendered": [...], "skipped": [...]} (page paths).
+    """
+    tails = _tails_by_page(cycles_path, pages)
+    states = _load_page_states(state_path, state_db, pages)
+
+    jobs = []
+    skipped = []
+    for p in pages:
+        base = os.path.join(output_dir, PAGES_SUBDIR, page_slug(p))
+        job = _plan_page(tails[p], states[p], base + ".html", base + ".md", config=config, page=p, index_href=f"../{SITE_INDEX}")
+        if job is None:
+            skipped.append(p)
+        else:
+            jobs.append((p, job))
+
+    # Feeds of the pages being rendered: new segments + the active file, each read once
+    feeds = {p: _feed_path(j["output_html"]) for p, j in jobs if j["output_html"]}
+    if feeds:
+        plans = _plan_feeds(cycles_path, feeds)
+        for p, j in jobs:
+            if p in plans:
+                j["feed"] = _write_feed(plans[p])
+
+    rendered = []
+    if len(jobs) == 1:
+        _write_page(jobs[0][1])
+        rendered.append(jobs[0][0])
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+            for (p, _), _out in zip(jobs, pool.map(_write_page, [j for _, j in jobs])):
+                rendered.append(p)
+
+    if primary in pages and primary_md:
+        src = os.path.join(output_dir, PAGES_SUBDIR, page_slug(primary)) + ".md"
+        # whole-file compare: live fields can change under an unchanged fingerprint
+        if os.path.exists(src) and not (os.path.exists(primary_md) and filecmp.cmp(src, primary_md, shallow=False)):
+            os.makedirs(os.path.dirname(primary_md) or ".", exist_ok=True)
+            shutil.copyfile(src, primary_md)
+
+    # Site-wide index (cheap: one table, rendered in-process)
+    rows = _site_rows(pages, tails, states)
+    fp_line = f"<!-- {FINGERPRINT_MARK}{_fingerprint({'version': DASHBOARD_VERSION, 'rows': rows})} -->"
+    index_path = os.path.join(output_dir, SITE_INDEX)
+    if fp_line not in _read_head(index_path):
+        os.makedirs(output_dir, exist_ok=True)
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write(_render_site_html(rows, fp_line))
+
+    print(f"[DASHBOARD] Pages rendered={len(rendered)} skipped={len(skipped)} ({output_dir})")
+    return {"rendered": rendered, "skipped": skipped}
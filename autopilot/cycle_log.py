@@ -1,18 +1,150 @@
 import json
 import os
-from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional
+
+from autopilot.replay import now_utc
 
 
 def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    return now_utc().isoformat().replace("+00:00", "Z")
+
+
+def _index_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".index.json"
+
+
+def _segment_path(path: str, n: int) -> str:
+    base, ext = os.path.splitext(path)
+    return f"{base}.{n:06d}{ext}"
+
 
+def load_index(path: str) -> dict:
+    """Segment index of a rotated log: closed segments (oldest first) with record counts and ts range."""
+    ip = _index_path(path)
+    if not os.path.exists(ip):
+        return {"segments": []}
+    with open(ip, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-def append_jsonl(path: str, obj: dict) -> None:
+
+def _rotate(path: str) -> None:
+    idx = load_index(path)
+    n = len(idx["segments"]) + 1
+    seg = _segment_path(path, n)
+    records = 0
+    first = last = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            records += 1
+            if first is None:
+                first = line
+            last = line
+    os.replace(path, seg)
+    idx["segments"].append({
+        "file": os.path.basename(seg),
+        "records": records,
+        "bytes": os.path.getsize(seg),
+        "first_ts": json.loads(first).get("timestamp_utc") if first else None,
+        "last_ts": json.loads(last).get("timestamp_utc") if last else None,
+    })
+    write_json(_index_path(path), idx)
+
+
+def append_jsonl(path: str, obj: dict, max_segment_bytes: Optional[int] = None) -> None:
+    """Append one record. With `max_segment_bytes`, a full active file is first
+    rotated to a numbered segment (path.000001.jsonl, ...) listed in path.index.json.
+    """
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if max_segment_bytes and os.path.exists(path) and os.path.getsize(path) >= max_segment_bytes:
+        _rotate(path)
     with open(path, "a", encoding="utf-8") as f:
         f.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
 
+def _reverse_lines(path: str, block: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield non-empty lines from the end of the file backwards, reading in blocks."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        rest = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            rest = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if rest.strip():
+            yield rest
+
+
+def read_tail(path: str, n: int, where: Optional[Callable[[dict], bool]] = None) -> List[dict]:
+    """Last `n` records (oldest first), optionally only those matching `where`.
+
+    Reads backwards from the end of the active file, then through rotated
+    segments newest-first, so cost depends on `n`, not on the log size.
+    """
+    files = [path] if os.path.exists(path) else []
+    base = os.path.dirname(path)
+    for seg in reversed(load_index(path)["segments"]):
+        files.append(os.path.join(base, seg["file"]))
+
+    out: List[dict] = []
+    for fp in files:
+        if not os.path.exists(fp):
+            continue
+        for line in _reverse_lines(fp):
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue
+            if where is not None and not where(rec):
+                continue
+            out.append(rec)
+            if len(out) >= n:
+                return out[::-1]
+    return out[::-1]
+
+
+def segment_files(path: str) -> List[str]:
+    """Rotated segments of `path`, oldest first (closed: never written again)."""
+    base = os.path.dirname(path)
+    return [os.path.join(base, seg["file"]) for seg in load_index(path)["segments"]]
+
+
+def iter_file(fp: str, where: Optional[Callable[[dict], bool]] = None) -> Iterator[dict]:
+    """Records of one file of the log (a segment or the active file)."""
+    if not os.path.exists(fp):
+        return
+    with open(fp, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue
+            if where is None or where(rec):
+                yield rec
+
+
+def iter_records(path: str, where: Optional[Callable[[dict], bool]] = None) -> Iterator[dict]:
+    """Every record oldest first: rotated segments, then the active file."""
+    for fp in segment_files(path) + [path]:
+        yield from iter_file(fp, where)
+
+
+def read_json(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 def write_json(path: str, obj: dict) -> None:
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
@@ -0,0 +1,215 @@
+# autopilot/decision.py
+"""Side-effect-free decision engine: hold / rollback / explore.
+
+decide() reads a page-state snapshot (variant and intent aggregates, active
+variant, template rotation) and returns what to do plus the state delta to
+apply. It does no I/O and never mutates its inputs, so run.py, replays and
+benchmarks all go through the same rules. Intent totals come from the running
+intent_agg, or are summed from the variants when a snapshot has none.
+
+selection_mode "rotate" (default) explores templates round-robin and rolls
+back to the best variant; "thompson" serves a posterior draw instead
+(autopilot.bandit), which is random but reproducible for a given `seed`.
+With rollback_test "sprt" a rollback is decided by a sequential test
+(autopilot.sequential) instead of the fixed eval_min_* / drop thresholds;
+it still waits for the guardrail and min_impressions_to_change.
+
+    params = DecisionParams.from_config(cfg)        # once
+    d = decide(state, total_impr, scores_by_intent, pool_sizes, params, can_change)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from autopilot.bandit import arm_keys, thompson
+from autopilot.sequential import sprt_drop
+from autopilot.scoring import choose_best_intent, choose_best_variant, intent_summary
+from autopilot.state_store import last_change
+
+
+@dataclass(frozen=True)
+class DecisionParams:
+    min_impressions_to_change: float = 50
+    eval_min_impressions: float = 120
+    eval_min_outbound: float = 2
+    rollback_drop_pct: float = 0.25
+    prefer_best_intent: bool = True
+    intent_switch_margin_pct: float = 0.15
+    best_intent_min_outbound: float = 3
+    selection_mode: str = "rotate"
+    bandit_prior_impressions: float = 200
+    bandit_include_baseline: bool = True
+    rollback_test: str = "threshold"
+    sprt_alpha: float = 0.05
+    sprt_beta: float = 0.2
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "DecisionParams":
+        return cls(
+            min_impressions_to_change=int(cfg.get("min_impressions_to_change", 50)),
+            eval_min_impressions=int(cfg.get("eval_min_impressions", 120)),
+            eval_min_outbound=int(cfg.get("eval_min_outbound_clicks", 2)),
+            rollback_drop_pct=float(cfg.get("rollback_drop_pct", 0.25)),
+            prefer_best_intent=bool(cfg.get("prefer_best_intent", True)),
+            intent_switch_margin_pct=float(cfg.get("intent_switch_margin_pct", 0.15)),
+            best_intent_min_outbound=float(cfg.get("best_intent_min_outbound_clicks", 3)),
+            selection_mode=str(cfg.get("selection_mode", "rotate")),
+            bandit_prior_impressions=float(cfg.get("bandit_prior_impressions", 200)),
+            bandit_include_baseline=bool(cfg.get("bandit_include_baseline", True)),
+            rollback_test=str(cfg.get("rollback_test", "threshold")),
+            sprt_alpha=float(cfg.get("sprt_alpha", 0.05)),
+            sprt_beta=float(cfg.get("sprt_beta", 0.2)),
+        )
+
+
+def variant_key(intent: str, idx: int) -> str:
+    return f"{intent}#{int(idx)}"
+
+
+def _agg(variants: dict, key: Optional[str]) -> dict:
+    return (variants.get(key) or {}).get("score_agg") or {} if key else {}
+
+
+def _sequential_test(state: dict, active_key: str, best_key: Optional[str], best_is_better: bool, params: DecisionParams) -> Optional[dict]:
+    """The active variant's sprt record: the stored one once a boundary was crossed, else re-evaluated.
+
+    The test belongs to the variant since the last HTML change; None when there
+    is nothing better to test against.
+    """
+    since = (last_change(state) or {}).get("timestamp_utc")
+    prev = state.get("sequential_test") or {}
+    if prev.get("current") == active_key and prev.get("since") == since and prev.get("decision") in ("rollback", "keep"):
+        return prev
+    if not best_is_better:
+        return None
+    ev = state.get("sprt_evidence") or {}
+    cur, best = ev.get(active_key) or {}, ev.get(best_key) or {}
+    seq = sprt_drop(
+        float(cur.get("outbound_clicks", 0.0)), float(cur.get("impressions", 0.0)),
+        float(best.get("outbound_clicks", 0.0)), float(best.get("impressions", 0.0)),
+        params.rollback_drop_pct, params.sprt_alpha, params.sprt_beta,
+    )
+    seq.update(current=active_key, best=best_key, since=since, windows_cur=int(cur.get("windows", 0)), windows_best=int(best.get("windows", 0)))
+    return seq
+
+
+def decide(
+    state: dict,
+    total_impr: float,
+    scores_by_intent: Dict[str, float],
+    pool_sizes: Dict[str, int],
+    params: DecisionParams,
+    can_change: bool,
+    seed: int = 0,
+) -> dict:
+    """Decision for one page, given its state after this window's observation was recorded.
+
+    `pool_sizes` is the number of templates per intent (intents without a pool
+    are never chosen). Returns action, chosen intent/index, the resulting
+    active `variant_key`, `rollback_to_baseline`, best/current scores and
+    `state_delta` (keys to set on the page state; `template_index_by_intent`
+    holds only the intents that changed). No change is proposed on hold.
+    In thompson mode the result also has `bandit` (sampled arm + posteriors),
+    with the sprt rollback test `sequential_test` (statistic and decision,
+    also stored in the state delta so a crossed boundary stays decided).
+    """
+    variants = state.get("variants") or {}
+    idx_by_intent = state.get("template_index_by_intent") or {}
+
+    candidates = [i for i in scores_by_intent if i in pool_sizes] or list(pool_sizes)
+    dominant_intent = max(candidates, key=lambda i: scores_by_intent.get(i, 0.0))
+    current_idx = int(idx_by_intent.get(dominant_intent, 0)) % pool_sizes[dominant_intent]
+
+    active_key = (state.get("active_variant") or {}).get("variant_key") or state.get("active_variant_key") or "baseline"
+    best_key = choose_best_variant(variants)
+
+    cur, best = _agg(variants, active_key), _agg(variants, best_key)
+    cur_out_1k = float(cur.get("outbound_per_1k_impr", 0.0))
+    best_out_1k = float(best.get("outbound_per_1k_impr", 0.0))
+
+    enough_to_eval = float(cur.get("impressions", 0.0)) >= params.eval_min_impressions and float(cur.get("outbound_clicks", 0.0)) >= params.eval_min_outbound
+    best_is_better = best_key is not None and best_key != active_key and best_out_1k > 0
+
+    bandit = None
+    if params.selection_mode == "thompson":
+        bandit = thompson(variants, arm_keys(pool_sizes, params.bandit_include_baseline), params.bandit_prior_impressions, seed)
+
+    do_rollback = False
+    rollback_key = best_key
+    seq = None
+    if bandit is None and params.rollback_test == "sprt":
+        seq = _sequential_test(state, active_key, best_key, best_is_better, params)
+        if seq is not None and seq["decision"] == "rollback":
+            # to the variant it was tested against, even if another one leads by now
+            do_rollback, rollback_key = True, seq["best"]
+    elif bandit is None and can_change and enough_to_eval and best_is_better:
+        drop = 1.0 - (cur_out_1k / best_out_1k)
+        do_rollback = drop >= params.rollback_drop_pct and float(best.get("outbound_clicks", 0.0)) >= params.eval_min_outbound
+
+    action = "hold"
+    chosen_intent, chosen_idx = dominant_intent, current_idx
+    new_key = active_key
+    to_baseline = False
+    delta: dict = {"best_variant_key": best_key}
+    if seq is not None:
+        delta["sequential_test"] = seq
+
+    if total_impr < params.min_impressions_to_change:
+        action = "hold_not_enough_impressions"
+        can_change = False
+
+    if can_change:
+        if bandit is not None:
+            # the posterior draw replaces both rollback and rotation
+            action = "thompson"
+            new_key = bandit["sampled"]
+            if "#" in new_key:
+                chosen_intent, idx_s = new_key.split("#", 1)
+                chosen_idx = int(idx_s)
+            else:
+                to_baseline = True
+            delta["template_index_by_intent"] = {chosen_intent: chosen_idx}
+        elif do_rollback:
+            action = "rollback"
+            new_key = rollback_key
+            if "#" in rollback_key:
+                chosen_intent, idx_s = rollback_key.split("#", 1)
+                chosen_idx = int(idx_s)
+            else:
+                to_baseline = True
+            # rollback keeps the winner's rotation index
+            delta["template_index_by_intent"] = {chosen_intent: chosen_idx}
+        else:
+            action = "explore"
+            # Prefer an intent that has proven better ECON performance, but only when evidence exists.
+            if params.prefer_best_intent:
+                ib = choose_best_intent(variants, state.get("intent_agg"))
+                if ib and ib.get("intent") in pool_sizes and ib["intent"] != dominant_intent and float(ib.get("outbound_clicks", 0.0)) >= params.best_intent_min_outbound:
+                    dom_1k = float(intent_summary(state, dominant_intent).get("outbound_per_1k_impr", 0.0))
+                    ib_1k = float(ib.get("outbound_per_1k_impr", 0.0))
+                    if (dom_1k <= 0 and ib_1k > 0) or ib_1k > dom_1k * (1.0 + params.intent_switch_margin_pct):
+                        chosen_intent = ib["intent"]
+            chosen_idx = int(idx_by_intent.get(chosen_intent, 0)) % pool_sizes[chosen_intent]
+            new_key = variant_key(chosen_intent, chosen_idx)
+            # explore advances the rotation
+            delta["template_index_by_intent"] = {chosen_intent: (chosen_idx + 1) % pool_sizes[chosen_intent]}
+        delta["active_variant_key"] = new_key
+
+    res = {
+        "action": action,
+        "can_change": can_change,
+        "dominant_intent": dominant_intent,
+        "chosen_intent": chosen_intent,
+        "chosen_idx": int(chosen_idx),
+        "variant_key": new_key,
+        "rollback_to_baseline": to_baseline,
+        "best_variant_key": best_key,
+        "scores": {"current_outbound_per_1k_impr": cur_out_1k, "best_outbound_per_1k_impr": best_out_1k},
+        "state_delta": delta,
+    }
+    if bandit is not None:
+        res["bandit"] = bandit
+    if seq is not None:
+        res["sequential_test"] = seq
+    return res
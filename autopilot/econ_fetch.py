@@ -6,10 +6,16 @@ import pandas as pd
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
+from autopilot import replay
 from autopilot.config import load_config
+from autopilot.snapshots import submit, write_csv
 
 
 def _build_sheets_service(creds_json: str):
+    return replay.service("sheets", lambda: _build_live_sheets_service(creds_json))
+
+
+def _build_live_sheets_service(creds_json: str):
     creds_info = json.loads(creds_json)
     credentials = service_account.Credentials.from_service_account_info(
         creds_info,
@@ -87,26 +93,7 @@ def _normalize_rows(rows: List[list], ncols: int) -> tuple[list, int, int, int]:
     return fixed, padded, truncated, skipped_empty
 
 
-def fetch_econ_sheet_to_csv(
-    spreadsheet_id: str,
-    output_csv: str,
-    creds_json: str,
-    sheet_name: Optional[str] = None,
-    max_cols: str = "Z",
-):
-    service = _build_sheets_service(creds_json)
-
-    meta = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-    titles = [s["properties"]["title"] for s in meta.get("sheets", [])]
-    chosen = sheet_name or _pick_sheet_name(titles)
-
-    rng = f"{chosen}!A1:{max_cols}"
-    resp = service.spreadsheets().values().get(spreadsheetId=spreadsheet_id, range=rng).execute()
-    values = resp.get("values", [])
-
-    if not values:
-        raise RuntimeError(f"No values returned from spreadsheet range: {rng}")
-
+def _values_to_df(values: List[list]) -> pd.DataFrame:
     header = values[0]
     rows = values[1:]
 
@@ -118,7 +105,10 @@ def fetch_econ_sheet_to_csv(
         header = [f"col_{i+1}" for i in range(len(values[0]))]
 
     header = _sanitize_header(header)
+    return _rows_to_df(rows, header)
+
 
+def _rows_to_df(rows: List[list], header: List[str]) -> pd.DataFrame:
     # IMPORTANT: Normalize ragged rows (Sheets API omits trailing empty cells)
     n = len(header)
     fixed_rows, padded, truncated, skipped_empty = _normalize_rows(rows, n)
@@ -127,16 +117,163 @@ def fetch_econ_sheet_to_csv(
             f"[ECON] Normalized rows: padded={padded}, truncated={truncated}, "
             f"skipped_empty={skipped_empty}, expected_cols={n}"
         )
+    return pd.DataFrame(fixed_rows, columns=header)
+
+
+def _sync_state_path(output_csv: str) -> str:
+    return os.path.splitext(output_csv)[0] + ".sync.json"
+
+
+def _load_sync_state(output_csv: str) -> dict:
+    path = _sync_state_path(output_csv)
+    if not (os.path.exists(path) and os.path.exists(output_csv)):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_sync_state(output_csv: str, sync: dict) -> None:
+    path = _sync_state_path(output_csv)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sync, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _write_snapshot(df: pd.DataFrame, output_csv: str, sync: dict, append: bool) -> None:
+    """Write/append the rows, then the marker (with the CSV size it vouches for).
+
+    One job on the snapshot thread: the marker is only replaced once the rows are
+    on disk. A crash in between leaves rows past "csv_bytes", cut off on resume.
+    """
+    write_csv(df, output_csv, append=append)
+    _save_sync_state(output_csv, {**sync, "csv_bytes": os.path.getsize(output_csv)})
+
+
+def _resume_snapshot(output_csv: str, sync: dict) -> bool:
+    """Bring the CSV back to the rows the marker counts; False when it has fewer (full resync)."""
+    size, expected = os.path.getsize(output_csv), sync.get("csv_bytes")
+    if expected is None or size < expected:
+        return False
+    if size > expected:
+        print(f"[ECON] {output_csv} has {size - expected} byte(s) past the sync marker (interrupted append). Trimming.")
+        with open(output_csv, "r+b") as f:
+            f.truncate(expected)
+    return True
+
 
-    df = pd.DataFrame(fixed_rows, columns=header)
+def fetch_econ_sheet_to_csv(
+    spreadsheet_id: str,
+    output_csv: str,
+    creds_json: str,
+    sheet_name: Optional[str] = None,
+    max_cols: str = "Z",
+):
+    _, stats = fetch_econ_sheet(spreadsheet_id, output_csv, creds_json, sheet_name=sheet_name, max_cols=max_cols)
+    return stats
+
+
+def fetch_econ_sheet(
+    spreadsheet_id: str,
+    output_csv: Optional[str],
+    creds_json: str,
+    sheet_name: Optional[str] = None,
+    max_cols: str = "Z",
+    incremental: bool = False,
+    background: bool = False,
+) -> tuple[pd.DataFrame, dict]:
+    """Download the click log; returns (raw frame, stats) for econ_loader.load_econ_clicks.
+
+    The frame holds the data rows from `stats["offset"]` on (also in
+    `df.attrs["offset"]`): the whole sheet (offset 0) after a full fetch.
+    `output_csv` is a side output (plus its .sync.json), written on the snapshot
+    thread when `background`; None skips it. With `incremental` (which needs the
+    snapshot's sync marker), only rows added to the (append-only) sheet since
+    the last run are downloaded, appended to the snapshot and returned: a single
+    batchGet reads the header row, the last row we ingested and everything after
+    it. If the header or that last row changed (rows were edited or deleted),
+    it falls back to a full resync. The marker is written after the rows (see
+    _write_snapshot), and rows an interrupted run appended past it are trimmed
+    before resuming, so they are not counted twice.
+    """
+    sync = _load_sync_state(output_csv) if incremental and output_csv else {}
+    if not sync or "rows" not in sync or (sheet_name and sheet_name != sync.get("sheet")):
+        return _fetch_full(spreadsheet_id, output_csv, creds_json, sheet_name, max_cols, background)
+    if not _resume_snapshot(output_csv, sync):
+        print(f"[ECON] {output_csv} is shorter than its sync marker. Full resync.")
+        return _fetch_full(spreadsheet_id, output_csv, creds_json, sync["sheet"], max_cols, background)
+
+    service = _build_sheets_service(creds_json)
+    chosen = sync["sheet"]
+    last = int(sync["last_row"])
+    ranges = [
+        f"{chosen}!A1:{max_cols}1",
+        f"{chosen}!A{last}:{max_cols}{last}",
+        f"{chosen}!A{last + 1}:{max_cols}",
+    ]
+    resp = service.spreadsheets().values().batchGet(spreadsheetId=spreadsheet_id, ranges=ranges).execute()
+    header_v, last_v, new_v = [vr.get("values", []) for vr in resp.get("valueRanges", [])]
+
+    if (header_v[:1] or [[]])[0] != sync["header"] or (last_v[:1] or [[]])[0] != sync["last_values"]:
+        print("[ECON] Sheet header or ingested rows changed. Full resync.")
+        return _fetch_full(spreadsheet_id, output_csv, creds_json, chosen, max_cols, background)
 
-    os.makedirs(os.path.dirname(output_csv) or ".", exist_ok=True)
-    df.to_csv(output_csv, index=False)
+    offset = int(sync["rows"])
+    df = _rows_to_df(new_v, sync["columns"])
+    df.attrs["offset"] = offset
+    if not new_v:
+        print(f"[ECON] No new rows since sheet row {last} (sheet='{chosen}')")
+        return df, {"mode": "incremental", "offset": offset, "rows": offset, "new_rows": 0}
+
+    sync["last_row"] = last + len(new_v)
+    sync["last_values"] = new_v[-1]
+    sync["rows"] = offset + len(df)
+    submit(_write_snapshot, df, output_csv, sync, True, background=background)
+
+    print(f"[ECON] Appended {len(df)} new rows to {output_csv} (sheet rows {last + 1}..{sync['last_row']})")
+    return df, {"mode": "incremental", "offset": offset, "rows": sync["rows"], "new_rows": int(len(df))}
+
+
+def _fetch_full(
+    spreadsheet_id: str,
+    output_csv: Optional[str],
+    creds_json: str,
+    sheet_name: Optional[str],
+    max_cols: str,
+    background: bool,
+) -> tuple[pd.DataFrame, dict]:
+    service = _build_sheets_service(creds_json)
+
+    meta = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+    titles = [s["properties"]["title"] for s in meta.get("sheets", [])]
+    chosen = sheet_name or _pick_sheet_name(titles)
+
+    rng = f"{chosen}!A1:{max_cols}"
+    resp = service.spreadsheets().values().get(spreadsheetId=spreadsheet_id, range=rng).execute()
+    values = resp.get("values", [])
+
+    if not values:
+        raise RuntimeError(f"No values returned from spreadsheet range: {rng}")
 
-    print(f"[ECON] Saved {len(df)} rows to {output_csv} (sheet='{chosen}')")
+    df = _values_to_df(values)
+    df.attrs["offset"] = 0
+
+    if output_csv:
+        # Remember where we stopped so the next run can fetch only new rows.
+        submit(_write_snapshot, df, output_csv, {
+            "sheet": chosen,
+            "header": values[0],
+            "columns": list(df.columns),
+            "last_row": len(values),
+            "last_values": values[-1],
+            "rows": int(len(df)),
+        }, False, background=background)
+
+    print(f"[ECON] Fetched {len(df)} rows (sheet='{chosen}'); snapshot: {output_csv or '-'}")
     if len(df) > 0:
         print("[ECON] Head:")
         print(df.head(3).to_string(index=False))
+    return df, {"mode": "full", "offset": 0, "rows": int(len(df)), "new_rows": int(len(df))}
 
 
 def main():
@@ -1,9 +1,13 @@
 # autopilot/econ_loader.py
 import re
-from typing import Optional
+from typing import Optional, Union
+from urllib.parse import urlsplit
 
+import numpy as np
 import pandas as pd
 
+from autopilot.snapshots import read_parquet
+
 
 def _norm(s: str) -> str:
     s = str(s).strip().lower()
@@ -23,8 +27,84 @@ def _find_col(cols, candidates):
     return None
 
 
-def load_econ_clicks(csv_path: str) -> pd.DataFrame:
-    """Load click logs from the Google Sheet export.
+# (name, sample regex, explicit format, prep), tried in order of how many sample rows they match
+TS_FORMATS = [
+    # What our sheet emits (new Date().toISOString(): "2026-01-18T20:28:11.092Z") and other
+    # ISO forms. "ISO8601" is pandas' C parser; a strptime-style format would be much slower.
+    ("iso8601", r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?", "ISO8601", None),
+    # Apps Script Date.toString(): "Mon Jan 06 2026 10:05:00 GMT-0300 (Argentina Standard Time)"
+    ("apps_script", r"[A-Z][a-z]{2} [A-Z][a-z]{2} \d{2} \d{4} \d{2}:\d{2}:\d{2} GMT[+-]\d{4}(?: \(.*\))?",
+     "%a %b %d %Y %H:%M:%S GMT%z", lambda s: s.str.replace(r" \(.*\)$", "", regex=True)),
+]
+TS_SAMPLE = 200
+# Bump when parse_timestamps accepts rows it used to drop: the rollup only parses new
+# sheet rows, so it is rebuilt from the whole log to pick up the older ones.
+TS_PARSER_VERSION = 2
+
+
+def _parse_as(s: pd.Series, fmt: tuple) -> pd.Series:
+    _, _, f, prep = fmt
+    return pd.to_datetime(prep(s) if prep else s, format=f, errors="coerce", utc=True)
+
+
+def _parse_row(x: str):
+    try:
+        ts = pd.Timestamp(re.sub(r" \(.*\)$", "", x))
+    except Exception:
+        return pd.NaT
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def parse_timestamps(raw: pd.Series) -> tuple[pd.Series, dict]:
+    """Vectorized timestamp parsing with an explicit format.
+
+    The dominant format is picked from an evenly spaced sample and the column is
+    parsed with it in one pass; rows it rejects go through the other known
+    formats (still vectorized) and only what remains is parsed row by row. Naive
+    timestamps are taken as UTC. Returns (ts, stats); unparsed rows are NaT.
+    """
+    s = raw.astype(str).str.strip()
+    ts = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns, UTC]")
+    stats = {"rows": int(len(s)), "format": None, "fast": 0, "other_formats": 0, "per_row": 0, "unparsed": 0}
+    if s.empty:
+        return ts, stats
+
+    sample = s.iloc[:: max(1, len(s) // TS_SAMPLE)]
+    hits = [(int(sample.str.fullmatch(rx).sum()), i) for i, (_, rx, _, _) in enumerate(TS_FORMATS)]
+    order = [TS_FORMATS[i] for n, i in sorted(hits, key=lambda h: (-h[0], h[1]))]
+    stats["format"] = order[0][0] if max(hits)[0] > 0 else None
+
+    # Whole column with the dominant format; each other format only sees what is left
+    todo = ~s.isin(["", "nan", "NaN", "None", "NaT"])
+    for k, fmt in enumerate(order):
+        if not todo.any():
+            break
+        parsed = _parse_as(s if todo.all() else s[todo], fmt)
+        ok = parsed.notna()
+        if ok.all() and len(parsed) == len(ts):
+            ts = parsed
+            todo[:] = False
+        elif ok.any():
+            ts[ok[ok].index] = parsed[ok]
+            todo[ok[ok].index] = False
+        stats["fast" if k == 0 else "other_formats"] += int(ok.sum())
+
+    if todo.any():
+        parsed = s[todo].map(_parse_row)
+        ok = parsed.notna()
+        if ok.any():
+            ts[ok[ok].index] = pd.to_datetime(parsed[ok], utc=True)
+        stats["per_row"] = int(ok.sum())
+    stats["unparsed"] = int(ts.isna().sum())
+    return ts, stats
+
+
+def load_econ_clicks(source: Union[str, pd.DataFrame]) -> pd.DataFrame:
+    """Load click logs from the Google Sheet export (CSV path or the raw frame
+    returned by econ_fetch.fetch_econ_sheet, which skips the CSV round-trip).
+
+    A .parquet path is a typed snapshot of this function's own output
+    (snapshots.ECON_SCHEMA) and is returned as read, without re-parsing.
 
     Expected minimum columns (case-insensitive):
     - id (go link id)
@@ -37,7 +117,13 @@ def load_econ_clicks(csv_path: str) -> pd.DataFrame:
       ref (str)
       ua (optional)
     """
-    df = pd.read_csv(csv_path)
+    if isinstance(source, pd.DataFrame):
+        df = source
+    elif str(source).lower().endswith(".parquet"):
+        return read_parquet(source, columns=["ts", "id", "ref", "ua"])
+    else:
+        # Cells as str, blanks as "" (same as frames built from sheet values)
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
     if df.empty:
         return df
 
@@ -62,41 +148,96 @@ def load_econ_clicks(csv_path: str) -> pd.DataFrame:
         out["ua"] = df[ua_col].astype(str)
 
     # Parse timestamps. If tz-naive, assume UTC.
-    ts = pd.to_datetime(out["ts_raw"], errors="coerce", utc=True)
-    if ts.isna().all():
-        # common Apps Script format: "Mon Jan 06 2026 10:05:00 GMT-0300 (Argentina Standard Time)"
-        ts = pd.to_datetime(out["ts_raw"].str.replace("GMT", "GMT"), errors="coerce", utc=True)
+    ts, stats = parse_timestamps(out["ts_raw"])
     out["ts"] = ts
     out = out.drop(columns=["ts_raw"])
     out = out.dropna(subset=["ts"])
+    out.attrs["ts_parse"] = stats
+    msg = f"[ECON] Timestamps: format={stats['format']} fast={stats['fast']} other={stats['other_formats']} per_row={stats['per_row']}"
+    if stats["unparsed"]:
+        msg += f" | {stats['unparsed']} unparsed row(s) dropped"
+    print(msg)
     return out
 
 
-def count_outbound_clicks(
+def page_key(url) -> str:
+    """Canonical page of a URL or referrer: "host/path".
+
+    Query string, fragment and trailing slashes are dropped, "www." and ".html"
+    too (GitHub Pages serves /x and /x.html alike), and index.html maps to "/".
+    So https://seine.travel/index.html?utm_source=x and https://seine.travel/
+    are the same page, while /best and /best-seine-cruises are not.
+    """
+    u = str(url or "").strip()
+    if not u or u.lower() == "nan":
+        return ""
+    parts = urlsplit(u if "//" in u else "//" + u)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = re.sub(r"(^|/)index\.html?$", "", parts.path.rstrip("/"))
+    path = re.sub(r"\.html?$", "", path).strip("/")
+    return f"{host}/{path}"
+
+
+def ref_codes(refs: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Referrers -> (integer page code per row, page keys indexed by code).
+
+    Only distinct referrer strings are parsed; rows are mapped through codes.
+    """
+    raw_codes, uniques = pd.factorize(refs.astype(str))
+    key_codes, keys = pd.factorize(pd.Index([page_key(u) for u in uniques], dtype="object"))
+    return np.asarray(key_codes)[raw_codes], np.asarray(keys, dtype="object")
+
+
+def split_by_page(counts: pd.Series, wanted: dict) -> dict:
+    """(page, id) -> clicks series into {page_url: {"outbound_clicks", "by_id"}},
+    where `wanted` maps each page_url to its page (key or code) in the index."""
+    by_page: dict = {}
+    for (pg, link_id), n in counts.items():
+        by_page.setdefault(pg, {})[str(link_id)] = int(n)
+    out = {}
+    for u, pg in wanted.items():
+        by_id = dict(sorted(by_page.get(pg, {}).items(), key=lambda kv: kv[1], reverse=True))
+        out[u] = {"outbound_clicks": sum(by_id.values()), "by_id": by_id}
+    return out
+
+
+def count_outbound_clicks_by_page(
     clicks_df: pd.DataFrame,
-    page_url: str,
+    page_urls: list,
     start_utc: Optional[pd.Timestamp] = None,
     end_utc: Optional[pd.Timestamp] = None,
-):
+) -> dict:
+    """count_outbound_clicks for many pages at once: one pass over page codes.
+
+    Returns {page_url: {"outbound_clicks", "by_id"}}.
+    """
+    out = {u: {"outbound_clicks": 0, "by_id": {}} for u in page_urls}
     if clicks_df is None or clicks_df.empty:
-        return {
-            "outbound_clicks": 0,
-            "by_id": {},
-        }
+        return out
 
     df = clicks_df
     if start_utc is not None:
         df = df[df["ts"] >= start_utc]
     if end_utc is not None:
         df = df[df["ts"] <= end_utc]
+    if df.empty:
+        return out
 
-    # attribute clicks to a page via referrer substring match
-    df = df[df["ref"].astype(str).str.contains(page_url, na=False)]
+    codes, keys = ref_codes(df["ref"])
+    code_of = {k: c for c, k in enumerate(keys)}
+    wanted = {u: code_of.get(page_key(u), -1) for u in page_urls}
+    rows = pd.DataFrame({"code": codes, "id": df["id"].astype(str).to_numpy()})
+    rows = rows[rows["code"].isin([c for c in wanted.values() if c >= 0])]
+    return split_by_page(rows.groupby(["code", "id"], sort=False).size(), wanted)
 
-    total = int(len(df))
-    by_id = df.groupby("id").size().sort_values(ascending=False).to_dict()
-    by_id = {str(k): int(v) for k, v in by_id.items()}
-    return {
-        "outbound_clicks": total,
-        "by_id": by_id,
-    }
+
+def count_outbound_clicks(
+    clicks_df: pd.DataFrame,
+    page_url: str,
+    start_utc: Optional[pd.Timestamp] = None,
+    end_utc: Optional[pd.Timestamp] = None,
+):
+    # attribute clicks to a page via its normalized referrer (see page_key)
+    return count_outbound_clicks_by_page(clicks_df, [page_url], start_utc, end_utc)[page_url]
@@ -0,0 +1,144 @@
+# autopilot/econ_rollup.py
+"""Daily rollup of outbound clicks keyed by (day, referrer page, go-link id).
+
+The click sheet only grows, so the cube is updated incrementally, keyed on the
+sheet row offset (econ_fetch hands over the rows after the last run's): each
+batch of new rows is parsed, grouped and added to existing cells, whatever its
+timestamps. Window and per-page queries then sum a handful of daily cells
+instead of scanning the log.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+
+from autopilot.econ_loader import TS_PARSER_VERSION, page_key, ref_codes, split_by_page
+
+# 2: pages are normalized referrer keys (econ_loader.page_key)
+# 3: ingestion keyed on the sheet row offset instead of a timestamp watermark
+ROLLUP_VERSION = 3
+CELL_COLUMNS = ["day", "page", "id", "clicks"]
+
+
+def _meta_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".meta.json"
+
+
+def _empty_cube() -> pd.DataFrame:
+    return pd.DataFrame({
+        "day": pd.Series(dtype="object"),
+        "page": pd.Series(dtype="object"),
+        "id": pd.Series(dtype="object"),
+        "clicks": pd.Series(dtype="int64"),
+    })
+
+
+def ref_page(refs: pd.Series) -> pd.Series:
+    """Referrer -> page key (see econ_loader.page_key); distinct referrers are parsed once."""
+    codes, keys = ref_codes(refs)
+    return pd.Series(keys[codes], index=refs.index, dtype="object")
+
+
+def _rollup(clicks_df: pd.DataFrame) -> pd.DataFrame:
+    if clicks_df is None or clicks_df.empty:
+        return _empty_cube()
+    cells = pd.DataFrame({
+        "day": clicks_df["ts"].dt.strftime("%Y-%m-%d"),
+        "page": ref_page(clicks_df["ref"]),
+        "id": clicks_df["id"].astype(str),
+    })
+    return cells.groupby(["day", "page", "id"], as_index=False, sort=False).size().rename(columns={"size": "clicks"})
+
+
+def _merge(cube: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    if delta.empty:
+        return cube
+    if cube.empty:
+        return delta
+    both = pd.concat([cube, delta], ignore_index=True)
+    return both.groupby(["day", "page", "id"], as_index=False, sort=True)["clicks"].sum()
+
+
+def _load_meta(path: str) -> dict:
+    """Meta of a cube that can take new rows; {} when missing or built by another version/parser."""
+    meta_path = _meta_path(path)
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        return {}
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != ROLLUP_VERSION or meta.get("parser") != TS_PARSER_VERSION:
+        return {}
+    return meta
+
+
+def _load_cube(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, dtype={"day": str, "page": str, "id": str, "clicks": "int64"}, keep_default_na=False)
+
+
+def _save(path: str, cube: pd.DataFrame, meta: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    cube[CELL_COLUMNS].to_csv(path, index=False)
+    with open(_meta_path(path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def needs_full_log(path: Optional[str]) -> bool:
+    """True when the next batch must be the whole sheet (offset 0): no persisted
+    cube, or one built by another rollup/parser version."""
+    return not path or not _load_meta(path)
+
+
+def update_rollup(clicks_df: pd.DataFrame, path: Optional[str] = None, offset: int = 0, n_rows: Optional[int] = None) -> pd.DataFrame:
+    """Fold a batch of click rows (load_econ_clicks of the sheet rows from data row
+    `offset` on, row index kept) into the persisted cube.
+
+    Meta "rows" is how many sheet rows the cube holds, so rows are counted once
+    whatever their order; a batch overlapping it is trimmed. A batch at offset 0
+    is the whole log and rebuilds the cube. `n_rows` is the batch's sheet row
+    count (rows whose timestamp did not parse still advance the offset).
+    Without `path`, the cube is built in memory only.
+    """
+    if not path:
+        return _rollup(clicks_df)
+
+    n_rows = (0 if clicks_df is None else len(clicks_df)) if n_rows is None else int(n_rows)
+    meta = _load_meta(path)
+    held = int(meta.get("rows", 0))
+
+    if offset == 0:
+        cube, new = _rollup(clicks_df), clicks_df
+    elif meta and offset <= held <= offset + n_rows:
+        new = clicks_df if held == offset or clicks_df.empty else clicks_df[clicks_df.index >= held - offset]
+        cube = _merge(_load_cube(path), _rollup(new))
+    else:
+        # Rows in between were never ingested: keep serving the cube, rebuild it next run
+        print(f"[ECON-ROLLUP] Batch starts at sheet row {offset}, rollup holds {held if meta else 'none'}. Rebuilding from the full sheet next run.")
+        if os.path.exists(_meta_path(path)):
+            os.remove(_meta_path(path))
+        return _load_cube(path) if meta else _rollup(clicks_df)
+
+    meta = {"version": ROLLUP_VERSION, "parser": TS_PARSER_VERSION, "rows": offset + n_rows}
+    _save(path, cube, meta)
+    print(f"[ECON-ROLLUP] Ingested {0 if new is None else len(new)} new row(s) (sheet rows {meta['rows']}); {len(cube)} cell(s) in {path}")
+    return cube
+
+
+def attribute_window(cube: pd.DataFrame, page_urls: list, start_day: date, end_day: date) -> dict:
+    """Outbound clicks per page over [start_day, end_day] (inclusive), for many pages at once.
+
+    Returns {page_url: {"outbound_clicks", "by_id"}} (see econ_loader.count_outbound_clicks).
+    Pages match by normalized key, so one groupby serves every page.
+    """
+    wanted = {u: page_key(u) for u in page_urls}
+    if cube is None or cube.empty:
+        return split_by_page(pd.Series(dtype="int64"), wanted)
+    df = cube[
+        (cube["day"] >= start_day.isoformat())
+        & (cube["day"] <= end_day.isoformat())
+        & cube["page"].isin(set(wanted.values()))
+    ]
+    return split_by_page(df.groupby(["page", "id"], sort=False)["clicks"].sum(), wanted)
@@ -0,0 +1,127 @@
+# autopilot/fetch_stage.py
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+
+from autopilot.gsc_fetch import build_service as build_gsc_service, fetch_gsc_range
+from autopilot.econ_fetch import fetch_econ_sheet
+from autopilot.gsc_store import prune_days, sync_days, read_window
+
+# googleapiclient services wrap an httplib2 connection, which is not thread-safe:
+# each worker thread builds (and reuses) its own GSC service.
+_local = threading.local()
+
+
+def _gsc_service():
+    svc = getattr(_local, "gsc_service", None)
+    if svc is None:
+        svc = _local.gsc_service = build_gsc_service()
+    return svc
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, round(time.perf_counter() - t0, 3)
+
+
+def _fetch_window(site_url: str, window: tuple[date, date]) -> pd.DataFrame:
+    return fetch_gsc_range(_gsc_service(), site_url=site_url, start_date=window[0], end_date=window[1])
+
+
+def _sync_store(site_url: str, windows: list[tuple[date, date]], lag_days: int, store_dir: str) -> dict:
+    stats = sync_days(_gsc_service(), site_url=site_url, windows=windows, lag_days=lag_days, store_dir=store_dir)
+    stats["days_pruned"] = prune_days(windows, lag_days, store_dir)
+    return stats
+
+
+def fetch_all(
+    site_url: str,
+    windows: list[tuple[date, date]],
+    fallback_window: Optional[tuple[date, date]] = None,
+    econ_sheet_id: Optional[str] = None,
+    econ_csv: Optional[str] = None,
+    creds_json: Optional[str] = None,
+    max_workers: int = 4,
+    store_dir: Optional[str] = None,
+    lag_days: int = 3,
+    econ_incremental: bool = False,
+    background_snapshots: bool = False,
+) -> dict:
+    """Run every network fetch of a cycle concurrently and join them.
+
+    Starts one GSC query per distinct window, the rolling fallback window (fetched
+    speculatively, so a 0-row window costs no extra round trip) and the econ sheet
+    download. Wall-clock time is about the slowest call, not the sum.
+
+    With `store_dir`, GSC goes through the local daily warehouse instead: a single
+    sync task fetches only the days not held yet, and every window is then read
+    from disk.
+
+    The econ sheet comes back as a raw frame ("econ_df", for load_econ_clicks):
+    with `econ_incremental`, only the rows after the last run's (the sheet row
+    offset is in its attrs, see econ_fetch.fetch_econ_sheet). `econ_csv` is
+    only its snapshot side output (None to skip it when not incremental).
+
+    Returns {"gsc": {window: DataFrame}, "econ_df": DataFrame | None, "timings": {...}}.
+    """
+    gsc_windows = list(dict.fromkeys(windows))
+    if fallback_window is not None and fallback_window not in gsc_windows:
+        gsc_windows.append(fallback_window)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(gsc_windows) + 1))) as pool:
+        if store_dir:
+            gsc_futures = {}
+            sync_future = pool.submit(_timed, _sync_store, site_url, gsc_windows, lag_days, store_dir)
+        else:
+            gsc_futures = {w: pool.submit(_timed, _fetch_window, site_url, w) for w in gsc_windows}
+            sync_future = None
+        econ_future = None
+        if econ_sheet_id:
+            econ_future = pool.submit(
+                _timed, fetch_econ_sheet,
+                spreadsheet_id=econ_sheet_id, output_csv=econ_csv, creds_json=creds_json,
+                incremental=econ_incremental, background=background_snapshots,
+            )
+
+        gsc = {}
+        calls = []
+        for w, fut in gsc_futures.items():
+            df, secs = fut.result()
+            gsc[w] = df
+            calls.append({
+                "call": "gsc_fallback" if w == fallback_window and w not in windows else "gsc",
+                "window": {"start": w[0].isoformat(), "end": w[1].isoformat()},
+                "rows": int(len(df)),
+                "seconds": secs,
+            })
+        if sync_future is not None:
+            stats, secs = sync_future.result()
+            calls.append({"call": "gsc_store_sync", **stats, "seconds": secs})
+            for w in gsc_windows:
+                gsc[w], secs = _timed(read_window, w[0], w[1], store_dir)
+                calls.append({
+                    "call": "gsc_store_read",
+                    "window": {"start": w[0].isoformat(), "end": w[1].isoformat()},
+                    "rows": int(len(gsc[w])),
+                    "seconds": secs,
+                })
+        econ_df = None
+        if econ_future is not None:
+            (econ_df, stats), secs = econ_future.result()
+            calls.append({"call": "econ_sheet", **(stats or {}), "seconds": secs})
+
+    wall = round(time.perf_counter() - t0, 3)
+    print(f"[FETCH] {len(calls)} call(s) in {wall}s (sum {round(sum(c['seconds'] for c in calls), 3)}s)")
+    return {
+        "gsc": gsc,
+        "econ_df": econ_df,
+        "timings": {"wall_seconds": wall, "calls": calls},
+    }
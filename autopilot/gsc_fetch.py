@@ -2,14 +2,22 @@ import json
 import os
 from datetime import date, timedelta
 
+import numpy as np
 import pandas as pd
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
+from autopilot import replay
+
 DEFAULT_SITE_URL = "sc-domain:seine.travel"
 
 
 def build_service():
+    """Search Console service (a recording/replaying stand-in per replay.api_mode())."""
+    return replay.service("gsc", _build_live_service)
+
+
+def _build_live_service():
     creds_json = os.environ["GSC_CREDENTIALS_JSON"]
     creds_info = json.loads(creds_json)
 
@@ -20,44 +28,71 @@ def build_service():
     return build("searchconsole", "v1", credentials=credentials)
 
 
-def fetch_gsc_range(service, site_url: str, start_date: date, end_date: date, row_limit=25000):
-    """Fetch page+query rows aggregated over a date range (inclusive)."""
+GSC_MAX_ROW_LIMIT = 25000
+DEFAULT_DIMENSIONS = ["page", "query"]
+METRICS = ["impressions", "clicks", "ctr", "position"]
+
+
+def _rows_to_chunk(rows: list, dimensions: list) -> pd.DataFrame:
+    """Turn one API page into a columnar chunk (no per-row dicts)."""
+    cols = {}
+    for i, dim in enumerate(dimensions):
+        cols[dim] = [r["keys"][i] for r in rows]
+    cols["impressions"] = np.fromiter((r.get("impressions", 0) for r in rows), dtype="float64", count=len(rows))
+    cols["clicks"] = np.fromiter((r.get("clicks", 0) for r in rows), dtype="float64", count=len(rows))
+    cols["ctr"] = np.fromiter((r.get("ctr", 0.0) for r in rows), dtype="float64", count=len(rows))
+    cols["position"] = np.fromiter((r.get("position", 0.0) for r in rows), dtype="float64", count=len(rows))
+    return pd.DataFrame(cols)
+
+
+def fetch_gsc_range(service, site_url: str, start_date: date, end_date: date, row_limit=GSC_MAX_ROW_LIMIT, dimensions=None):
+    """Fetch page+query rows aggregated over a date range (inclusive).
+
+    Pass dimensions=["date", "page", "query"] to get one row per day instead.
+
+    Pages through the API with `startRow` until a short page comes back, so sites
+    with more than 25k page×query pairs are fetched completely. Each page is
+    converted into a columnar chunk right away and the raw response dropped.
+    """
+    dimensions = list(dimensions or DEFAULT_DIMENSIONS)
+    row_limit = max(1, min(int(row_limit), GSC_MAX_ROW_LIMIT))
 
     request = {
         "startDate": start_date.isoformat(),
         "endDate": end_date.isoformat(),
-        "dimensions": ["page", "query"],
+        "dimensions": dimensions,
         "rowLimit": row_limit,
+        "startRow": 0,
     }
 
-    response = (
-        service.searchanalytics()
-        .query(siteUrl=site_url, body=request)
-        .execute()
-    )
-
-    rows = []
-    for row in response.get("rows", []):
-        page, query = row["keys"][0], row["keys"][1]
-        rows.append(
-            {
-                "page": page,
-                "query": query,
-                "impressions": row.get("impressions", 0),
-                "clicks": row.get("clicks", 0),
-                "ctr": row.get("ctr", 0.0),
-                "position": row.get("position", 0.0),
-                "startDate": request["startDate"],
-                "endDate": request["endDate"],
-            }
+    chunks = []
+    while True:
+        response = (
+            service.searchanalytics()
+            .query(siteUrl=site_url, body=request)
+            .execute()
         )
+        rows = response.get("rows", [])
+        if rows:
+            chunks.append(_rows_to_chunk(rows, dimensions))
+        if len(rows) < row_limit:
+            break
+        request["startRow"] += len(rows)
+
+    if not chunks:
+        return pd.DataFrame(columns=dimensions + METRICS + ["startDate", "endDate"])
 
-    return pd.DataFrame(rows)
+    df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    df["startDate"] = request["startDate"]
+    df["endDate"] = request["endDate"]
+    if len(chunks) > 1:
+        print(f"[GSC] Paged {len(chunks)} requests -> {len(df)} rows ({request['startDate']}..{request['endDate']})")
+    return df
 
 
-def fetch_gsc(service, site_url: str = DEFAULT_SITE_URL, days=28, row_limit=25000):
+def fetch_gsc(service, site_url: str = DEFAULT_SITE_URL, days=28, row_limit=GSC_MAX_ROW_LIMIT):
     """Backward compatible: fetch last N days ending yesterday."""
-    end_date = date.today() - timedelta(days=1)
+    end_date = replay.today() - timedelta(days=1)
     start_date = end_date - timedelta(days=days)
     return fetch_gsc_range(service, site_url=site_url, start_date=start_date, end_date=end_date, row_limit=row_limit)
 
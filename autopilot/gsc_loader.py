@@ -3,6 +3,8 @@ import pandas as pd
 from pandas.errors import EmptyDataError
 import re
 
+from autopilot.snapshots import read_parquet
+
 EXPECTED = ["query", "impressions", "clicks", "ctr", "position"]
 
 def _norm(s: str) -> str:
@@ -15,16 +17,74 @@ def _norm(s: str) -> str:
 def _empty_df():
     return pd.DataFrame(columns=EXPECTED)
 
-def load_gsc_data(path: str, html_path: str, base_url: str) -> pd.DataFrame:
-    # ---- CSV path (new) ----
-    if str(path).lower().endswith(".csv"):
+def target_page_url(html_path: str, base_url: str) -> str:
+    html = str(html_path).lstrip("./")
+    if html in ("index.html", "/"):
+        return base_url
+    return f"{base_url}{html}"
+
+def _aggregate_queries(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.groupby("query", as_index=False, observed=True).agg(
+        impressions=("impressions", "sum"),
+        clicks=("clicks", "sum"),
+        ctr=("ctr", "mean"),
+        position=("position", "mean"),
+    )
+
+    # asegurar esquema
+    for c in EXPECTED:
+        if c not in out.columns:
+            out[c] = None
+    return out[EXPECTED]
+
+def split_gsc_by_page(df: pd.DataFrame, html_paths: list, base_url: str) -> dict:
+    """Split a site-wide page+query frame into per-page query tables.
+
+    One groupby pass over the raw rows, regardless of how many pages are tracked.
+    Pages without rows get an empty frame (autopilot will HOLD on them).
+    """
+    out = {h: _empty_df() for h in html_paths}
+    if df is None or df.empty:
+        return out
+
+    required = {"page", "query", "impressions", "clicks", "ctr", "position"}
+    missing = required - set(df.columns)
+    if missing:
+        raise RuntimeError(f"GSC frame missing columns: {missing}. Found: {list(df.columns)}")
+
+    wanted = {target_page_url(h, base_url): h for h in html_paths}
+    df = df[df["page"].isin(wanted.keys())]
+    for page, g in df.groupby("page", sort=False, observed=True):
+        out[wanted[page]] = _aggregate_queries(g)
+    for h in html_paths:
+        print(f"[AUTOPILOT] GSC split to page: {target_page_url(h, base_url)} | rows={len(out[h])}")
+    return out
+
+def load_gsc_data(path, html_path: str, base_url: str) -> pd.DataFrame:
+    # ---- typed parquet snapshot: only this page's rows, only the needed columns ----
+    if str(path).lower().endswith(".parquet"):
         try:
-            df = pd.read_csv(path)
+            df = read_parquet(path, columns=["page"] + EXPECTED, filters=[("page", "==", target_page_url(html_path, base_url))])
         except FileNotFoundError:
             return _empty_df()
-        except EmptyDataError:
-            # CSV vacío es válido (lag de GSC / poco tráfico)
+        print(f"[AUTOPILOT] Parquet filtered to page: {target_page_url(html_path, base_url)} | rows={len(df)}")
+        if df.empty:
             return _empty_df()
+        df["query"] = df["query"].astype(str)
+        return _aggregate_queries(df)
+
+    # ---- in-memory frame (output of gsc_fetch), or CSV path ----
+    if isinstance(path, pd.DataFrame) or str(path).lower().endswith(".csv"):
+        if isinstance(path, pd.DataFrame):
+            df = path
+        else:
+            try:
+                df = pd.read_csv(path)
+            except FileNotFoundError:
+                return _empty_df()
+            except EmptyDataError:
+                # CSV vacío es válido (lag de GSC / poco tráfico)
+                return _empty_df()
 
         if df is None or df.empty:
             return _empty_df()
@@ -34,31 +94,14 @@ def load_gsc_data(path: str, html_path: str, base_url: str) -> pd.DataFrame:
         if missing:
             raise RuntimeError(f"CSV missing columns: {missing}. Found: {list(df.columns)}")
 
-        html = str(html_path).lstrip("./")
-        if html in ("index.html", "/"):
-            target_page = base_url
-        else:
-            target_page = f"{base_url}{html}"
-
+        target_page = target_page_url(html_path, base_url)
         df = df[df["page"] == target_page].copy()
         print(f"[AUTOPILOT] CSV filtered to page: {target_page} | rows={len(df)}")
 
         # Si no hay filas, NO rompemos: devolvemos vacío para que el autopilot haga HOLD.
         if df.empty:
             return _empty_df()
-
-        out = df.groupby("query", as_index=False).agg(
-            impressions=("impressions", "sum"),
-            clicks=("clicks", "sum"),
-            ctr=("ctr", "mean"),
-            position=("position", "mean"),
-        )
-
-        # asegurar esquema
-        for c in EXPECTED:
-            if c not in out.columns:
-                out[c] = None
-        return out[EXPECTED]
+        return _aggregate_queries(df)
 
     # ---- XLSX legacy (fallback) ----
     try:
@@ -0,0 +1,155 @@
+# autopilot/gsc_store.py
+"""Local GSC warehouse: one CSV partition per day (page, query, metrics).
+
+Days are filled through the `date` dimension and only fetched when missing or
+still provisional. Windows end `lag_days` before today, so the newest `lag_days`
+days of the store were fetched less than `2 * lag_days` after the day itself and
+GSC may still revise them; those are fetched again. Any evaluation window is
+then answered from disk. Days older than the longest window of the cycle plus
+`2 * lag_days` are pruned (see prune_days), so the store does not grow forever.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+
+from autopilot import replay
+from autopilot.gsc_fetch import fetch_gsc_range, METRICS
+
+DEFAULT_STORE_DIR = "data/gsc_daily"
+MANIFEST = "_manifest.json"
+PARTITION_COLUMNS = ["page", "query"] + METRICS
+
+
+def _days(start: date, end: date) -> list[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _partition_path(store_dir: str, day: date) -> str:
+    return os.path.join(store_dir, f"{day.isoformat()}.csv")
+
+
+def load_manifest(store_dir: str = DEFAULT_STORE_DIR) -> dict:
+    """Map of day (ISO) -> date it was fetched (ISO)."""
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("days", {})
+
+
+def _save_manifest(store_dir: str, days: dict) -> None:
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"days": dict(sorted(days.items()))}, f, indent=2)
+
+
+def days_to_fetch(windows: list[tuple[date, date]], lag_days: int, store_dir: str = DEFAULT_STORE_DIR) -> list[date]:
+    """Days covered by `windows` that are missing locally or were fetched while still provisional."""
+    manifest = load_manifest(store_dir)
+    wanted = sorted({d for start, end in windows for d in _days(start, end)})
+    out = []
+    for d in wanted:
+        fetched_on = manifest.get(d.isoformat())
+        if fetched_on is None or not os.path.exists(_partition_path(store_dir, d)):
+            out.append(d)
+        elif (date.fromisoformat(fetched_on) - d).days < 2 * lag_days:
+            out.append(d)
+    return out
+
+
+def _contiguous_ranges(days: list[date]) -> list[tuple[date, date]]:
+    ranges = []
+    for d in sorted(days):
+        if ranges and d == ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], d)
+        else:
+            ranges.append((d, d))
+    return ranges
+
+
+def sync_days(
+    service,
+    site_url: str,
+    windows: list[tuple[date, date]],
+    lag_days: int,
+    store_dir: str = DEFAULT_STORE_DIR,
+) -> dict:
+    """Fetch only the days of `windows` the store does not hold yet (plus provisional ones).
+
+    One paged query per contiguous run of missing days. Days with no rows still
+    get an (empty) partition so they are not fetched again.
+    """
+    missing = days_to_fetch(windows, lag_days, store_dir)
+    manifest = load_manifest(store_dir)
+    today = replay.today().isoformat()
+    rows = 0
+    ranges = _contiguous_ranges(missing)
+
+    os.makedirs(store_dir, exist_ok=True)
+    for r_start, r_end in ranges:
+        df = fetch_gsc_range(service, site_url=site_url, start_date=r_start, end_date=r_end, dimensions=["date", "page", "query"])
+        rows += len(df)
+        by_day = dict(tuple(df.groupby("date", sort=False))) if len(df) else {}
+        for d in _days(r_start, r_end):
+            part = by_day.get(d.isoformat())
+            part = part[PARTITION_COLUMNS] if part is not None else pd.DataFrame(columns=PARTITION_COLUMNS)
+            part.to_csv(_partition_path(store_dir, d), index=False)
+            manifest[d.isoformat()] = today
+
+    if ranges:
+        _save_manifest(store_dir, manifest)
+    print(f"[GSC-STORE] Fetched {len(missing)} day(s) in {len(ranges)} range(s), {rows} rows")
+    return {"days_fetched": len(missing), "ranges": len(ranges), "rows": rows}
+
+
+def prune_days(windows: list[tuple[date, date]], lag_days: int, store_dir: str = DEFAULT_STORE_DIR) -> int:
+    """Delete partitions older than the longest of `windows` plus 2 * lag_days (before today); returns how many."""
+    if not windows:
+        return 0
+    longest = max((end - start).days + 1 for start, end in windows)
+    cutoff = replay.today() - timedelta(days=longest + 2 * lag_days)
+    manifest = load_manifest(store_dir)
+    old = [d for d in manifest if date.fromisoformat(d) < cutoff]
+    for d in old:
+        path = _partition_path(store_dir, date.fromisoformat(d))
+        if os.path.exists(path):
+            os.remove(path)
+        del manifest[d]
+    if old:
+        _save_manifest(store_dir, manifest)
+        print(f"[GSC-STORE] Pruned {len(old)} day(s) before {cutoff.isoformat()}")
+    return len(old)
+
+
+def read_window(start: date, end: date, store_dir: str = DEFAULT_STORE_DIR) -> pd.DataFrame:
+    """Aggregate daily partitions into the page+query shape of fetch_gsc_range.
+
+    Clicks and impressions are summed; ctr is recomputed and position is the
+    impression-weighted mean, which is how GSC aggregates over a range.
+    """
+    parts = []
+    for d in _days(start, end):
+        path = _partition_path(store_dir, d)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            parts.append(pd.read_csv(path))
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=PARTITION_COLUMNS + ["startDate", "endDate"])
+
+    df = pd.concat(parts, ignore_index=True)
+    df["_pos_w"] = df["position"] * df["impressions"]
+    out = df.groupby(["page", "query"], as_index=False, sort=False).agg(
+        impressions=("impressions", "sum"),
+        clicks=("clicks", "sum"),
+        _pos_w=("_pos_w", "sum"),
+    )
+    impr = out["impressions"].where(out["impressions"] > 0)
+    out["ctr"] = (out["clicks"] / impr).fillna(0.0)
+    out["position"] = (out["_pos_w"] / impr).fillna(0.0)
+    out["startDate"] = start.isoformat()
+    out["endDate"] = end.isoformat()
+    return out[PARTITION_COLUMNS + ["startDate", "endDate"]]
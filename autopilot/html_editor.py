@@ -1,4 +1,5 @@
 # autopilot/html_editor.py
+import os
 import re
 
 def replace_slot(slot_name: str, new_content: str, html: str) -> str:
@@ -10,6 +11,17 @@ def replace_slot(slot_name: str, new_content: str, html: str) -> str:
         raise RuntimeError(f"Slot not found: {slot_name}")
     return pattern.sub(rf"\1\n{new_content}\n\3", html)
 
+def has_title_meta_slots(html_path: str) -> bool:
+    """True when the page has both the TITLE and META slots (pages without them are never edited)."""
+    if not os.path.exists(html_path):
+        return False
+    with open(html_path, "r", encoding="utf-8") as f:
+        html = f.read()
+    return all(
+        re.search(rf"<!--\s*AUTOPILOT:{slot}:START\s*-->.*?<!--\s*AUTOPILOT:{slot}:END\s*-->", html, re.DOTALL | re.IGNORECASE)
+        for slot in ("TITLE", "META")
+    )
+
 def apply_title_meta_slots(html_path: str, title: str, meta: str) -> bool:
     with open(html_path, "r", encoding="utf-8") as f:
         html = f.read()
@@ -23,3 +35,17 @@ def apply_title_meta_slots(html_path: str, title: str, meta: str) -> bool:
         with open(html_path, "w", encoding="utf-8") as f:
             f.write(new_html)
     return changed
+
+def read_title_meta_slots(html_path: str) -> dict:
+    """Read the current TITLE/META slot contents (used to seed a page baseline)."""
+    with open(html_path, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    out = {"title": "", "meta": ""}
+    m = re.search(r"<!--\s*AUTOPILOT:TITLE:START\s*-->.*?<title>(.*?)</title>", html, re.DOTALL | re.IGNORECASE)
+    if m:
+        out["title"] = m.group(1).strip()
+    m = re.search(r'<!--\s*AUTOPILOT:META:START\s*-->.*?content="(.*?)"', html, re.DOTALL | re.IGNORECASE)
+    if m:
+        out["meta"] = m.group(1).strip()
+    return out
@@ -1,18 +1,111 @@
 # autopilot/intent.py
+import hashlib
+import json
+import os
 import re
+from functools import lru_cache
+from typing import Optional
 
-def detect_dominant_intent(df) -> str:
-    intent_scores = {"comparison": 0.0, "price": 0.0, "trust": 0.0}
+import numpy as np
+import pandas as pd
 
-    for _, row in df.iterrows():
-        q = str(row["query"]).lower()
-        w = float(row["impressions"])
+# Default lexicon; config.json "intent_lexicon" overrides it.
+INTENT_LEXICON = {
+    "comparison": ["best", "top", "which"],
+    "price": ["price", "cost", "cheap"],
+    "trust": ["review", "reviews", "worth"],
+}
+# Label cache size (distinct normalized queries); config.json "intent_cache_max_entries" overrides it.
+LABEL_CACHE_MAX = 50000
 
-        if re.search(r"\b(best|top|which)\b", q):
-            intent_scores["comparison"] += w
-        if re.search(r"\b(price|cost|cheap)\b", q):
-            intent_scores["price"] += w
-        if re.search(r"\b(review|reviews|worth)\b", q):
-            intent_scores["trust"] += w
 
-    return max(intent_scores, key=intent_scores.get)
+def _lexicon_key(lexicon: dict) -> tuple:
+    return tuple((intent, tuple(str(w).lower().strip() for w in words)) for intent, words in lexicon.items())
+
+
+@lru_cache(maxsize=8)
+def _compile(key: tuple):
+    """One whole-word alternation regex per intent (None without keywords), plus the lexicon fingerprint."""
+    patterns = []
+    for _, words in key:
+        alternation = "|".join(re.escape(w) for w in sorted({w for w in words if w}, key=len, reverse=True))
+        patterns.append(re.compile(rf"\b(?:{alternation})\b") if alternation else None)
+    fingerprint = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()[:12]
+    return patterns, fingerprint
+
+
+def _classify(patterns: list, queries: pd.Series) -> pd.Series:
+    """Intent bitmask per (normalized) query: each pattern runs once over the column."""
+    masks = np.zeros(len(queries), dtype="int64")
+    for bit, p in enumerate(patterns):
+        if p is not None:
+            masks |= queries.str.contains(p, regex=True, na=False).to_numpy(dtype="int64") << bit
+    return pd.Series(masks, index=queries.index)
+
+
+def normalize_query(q: pd.Series) -> pd.Series:
+    return q.astype(str).str.lower().str.strip().str.replace(r"\s+", " ", regex=True)
+
+
+def load_label_cache(path: Optional[str]) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_label_cache(path: Optional[str], cache: dict, max_entries: int = LABEL_CACHE_MAX) -> None:
+    """Persist the cache, keeping only the `max_entries` most recently added labels."""
+    if not path or not cache:
+        return
+    labels = cache.get("labels") or {}
+    if len(labels) > max_entries:
+        # dicts keep insertion order: the oldest labels go first
+        cache["labels"] = dict(list(labels.items())[len(labels) - max_entries:])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def intent_scores(df, lexicon: Optional[dict] = None, cache: Optional[dict] = None) -> dict:
+    """Impression-weighted score per intent over the whole query column.
+
+    Queries are factorized; their labels (intent bitmasks) are looked up in
+    `cache` with one map over the distinct queries, and only the missing ones
+    are normalized and go through the compiled patterns. The scores are then one
+    matrix product of the bit matrix with the impressions vector. `cache` (see
+    load_label_cache) is updated in place and reset when the lexicon changes.
+    """
+    lexicon = lexicon or INTENT_LEXICON
+    key = _lexicon_key(lexicon)
+    intents = [intent for intent, _ in key]
+    if df is None or len(df) == 0:
+        return {intent: 0.0 for intent in intents}
+
+    patterns, fingerprint = _compile(key)
+    if cache is None:
+        cache = {}
+    if cache.get("lexicon") != fingerprint:
+        cache.clear()
+        cache.update({"lexicon": fingerprint, "intents": intents, "labels": {}})
+    labels = cache["labels"]
+
+    codes, uniques = pd.factorize(df["query"].astype(str))
+    uniques = pd.Series(uniques, dtype="object")
+    masks = uniques.map(labels)
+    missing = masks.isna()
+    if missing.any():
+        new = _classify(patterns, normalize_query(uniques[missing]))
+        masks[missing] = new
+        labels.update(zip(uniques[missing], new.tolist()))
+    masks = masks.to_numpy(dtype="int64")
+
+    bits = (masks[codes][:, None] >> np.arange(len(intents))) & 1
+    w = pd.to_numeric(df["impressions"], errors="coerce").fillna(0.0).to_numpy(dtype="float64")
+    scores = w @ bits
+    return {intent: float(s) for intent, s in zip(intents, scores)}
+
+
+def detect_dominant_intent(df, lexicon: Optional[dict] = None, cache: Optional[dict] = None) -> str:
+    scores = intent_scores(df, lexicon=lexicon, cache=cache)
+    return max(scores, key=scores.get)
@@ -1,20 +1,19 @@
 # autopilot/policy.py
-from datetime import datetime, timezone
+from datetime import datetime
+
+from autopilot.replay import now_utc
+from autopilot.state_store import last_change
 
 def _parse_ts(ts: str):
     return datetime.fromisoformat(ts.replace("Z", "+00:00"))
 
 def days_since_last_change(state: dict) -> int:
-    hist = state.get("history", [])
-    for item in reversed(hist):
-        # Ignorar el seed inicial (no queremos que bloquee el primer explore real)
-        if item.get("action") == "baseline_seed":
-            continue
-
-        if item.get("changed_html") is True and item.get("timestamp_utc"):
-            last = _parse_ts(item["timestamp_utc"])
-            now = datetime.now(timezone.utc)
-            return (now - last).days
+    # Ignorar el seed inicial (no queremos que bloquee el primer explore real)
+    item = last_change(state, skip_actions=("baseline_seed",))
+    if item:
+        last = _parse_ts(item["timestamp_utc"])
+        now = now_utc()
+        return (now - last).days
 
     return 999
 
@@ -0,0 +1,234 @@
+# autopilot/replay.py
+"""Record and replay the GSC / Sheets API calls of a cycle.
+
+config "api_mode" (env AUTOPILOT_API_MODE overrides):
+  "live"    real services, nothing saved
+  "record"  real services; every executed request is saved as a JSON fixture
+            under `fixtures_dir` (<api>/<method>-<hash of the request>.json)
+  "replay"  no credentials, no network: responses come from the fixtures, or,
+            for requests never recorded, are synthesized from data/*.csv
+            (GSC rows from gsc_file scaled to the requested days, the click
+            sheet from econ_csv)
+
+Services are stand-ins for the googleapiclient chains the fetchers use:
+searchanalytics().query, spreadsheets().get and spreadsheets().values()
+.get/.batchGet. Fixtures are keyed by the request, so a replay only hits them
+for the same windows: set AUTOPILOT_TODAY=YYYY-MM-DD (the recorded run's date,
+noon UTC; or a full ISO timestamp) to pin the clock and reproduce that run.
+Every clock of a cycle (windows, guardrail, cycle/history/applied_at
+timestamps, GSC store manifest, dashboard staleness) reads today()/now_utc(),
+so two replays of the same inputs write the same records.
+
+A replay is a full cycle (state, HTML, logs, rollup and GSC store are written
+as usual; only the data/*.csv snapshots are left alone): run it on a scratch
+checkout.
+
+    AUTOPILOT_API_MODE=replay AUTOPILOT_TODAY=2026-08-03 python -m autopilot.run
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Optional
+
+import pandas as pd
+
+MODES = ("live", "record", "replay")
+FIXTURES_DIR = "data/fixtures"
+SYNTH_SHEET = "logs"
+
+_settings = {"mode": "live", "dir": FIXTURES_DIR, "synthesize": True, "gsc_csv": "data/gsc_latest.csv", "econ_csv": "data/econ_clicks_latest.csv"}
+
+
+def configure(cfg: dict) -> str:
+    """Set the API mode from config/env; returns it."""
+    mode = os.environ.get("AUTOPILOT_API_MODE") or cfg.get("api_mode", "live")
+    if mode not in MODES:
+        raise ValueError(f"api_mode must be one of {MODES}, got {mode!r}")
+    _settings.update(
+        mode=mode,
+        dir=cfg.get("fixtures_dir", FIXTURES_DIR),
+        synthesize=bool(cfg.get("replay_synthesize", True)),
+        gsc_csv=cfg.get("gsc_file", _settings["gsc_csv"]),
+        econ_csv=cfg.get("econ_csv", _settings["econ_csv"]),
+    )
+    return mode
+
+
+def api_mode() -> str:
+    return _settings["mode"]
+
+
+def _pinned() -> Optional[datetime]:
+    value = os.environ.get("AUTOPILOT_TODAY")
+    if not value:
+        return None
+    if "T" not in value:
+        return datetime.combine(date.fromisoformat(value), time(12, 0), tzinfo=timezone.utc)
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def today() -> date:
+    """date.today(), or AUTOPILOT_TODAY when pinned (replays of a recorded run)."""
+    pinned = _pinned()
+    return pinned.date() if pinned else date.today()
+
+
+def now_utc() -> datetime:
+    """Current UTC time; fixed at AUTOPILOT_TODAY when pinned."""
+    return _pinned() or datetime.now(timezone.utc)
+
+
+def service(api: str, build: Callable[[], object]):
+    """The service for `api` ("gsc" / "sheets") in the current mode; `build` makes the real one."""
+    mode = _settings["mode"]
+    if mode == "replay":
+        return _Call(api, None)
+    return _Call(api, build()) if mode == "record" else build()
+
+
+# ---------------- fixtures ----------------
+
+def _fixture_path(api: str, method: str, kwargs: dict) -> str:
+    digest = hashlib.sha1(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return os.path.join(_settings["dir"], api, f"{method}-{digest}.json")
+
+
+def _save_fixture(api: str, method: str, kwargs: dict, response: dict) -> None:
+    path = _fixture_path(api, method, kwargs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"api": api, "method": method, "request": kwargs, "recorded_at": now_utc().isoformat(), "response": response}, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def _load_fixture(api: str, method: str, kwargs: dict) -> Optional[dict]:
+    path = _fixture_path(api, method, kwargs)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["response"]
+
+
+def prune(keep: int) -> int:
+    """Delete all but the `keep` newest fixtures; returns how many were removed."""
+    files = sorted(glob.glob(os.path.join(_settings["dir"], "*", "*.json")), key=os.path.getmtime, reverse=True)
+    for p in files[keep:]:
+        os.remove(p)
+    return max(0, len(files) - keep)
+
+
+class _Call:
+    """One step of a googleapiclient chain (svc.spreadsheets().values().get(...)).
+
+    Wraps the real object when recording; `target` is None when replaying.
+    """
+
+    def __init__(self, api: str, target, path: tuple = (), kwargs: Optional[dict] = None):
+        self._api, self._target, self._path, self._kwargs = api, target, path, kwargs or {}
+
+    def __getattr__(self, name: str):
+        def call(**kwargs):
+            target = getattr(self._target, name)(**kwargs) if self._target is not None else None
+            return _Call(self._api, target, self._path + (name,), kwargs)
+        return call
+
+    def execute(self) -> dict:
+        method = ".".join(self._path)
+        if self._target is not None:
+            response = self._target.execute()
+            _save_fixture(self._api, method, self._kwargs, response)
+            return response
+        response = _load_fixture(self._api, method, self._kwargs)
+        if response is None and _settings["synthesize"]:
+            response = _synthesize(self._api, method, self._kwargs)
+        if response is None:
+            raise RuntimeError(f"[REPLAY] No fixture for {self._api} {method} {self._kwargs}")
+        return response
+
+
+# ---------------- synthesized responses (data/*.csv) ----------------
+
+@lru_cache(maxsize=4)
+def _csv(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def _gsc_query(body: dict) -> dict:
+    """gsc_file rows as one typical window: metrics scaled by requested days / file days."""
+    df = _csv(_settings["gsc_csv"])
+    if "startDate" in df.columns and len(df):
+        file_days = (date.fromisoformat(df["endDate"].max()) - date.fromisoformat(df["startDate"].min())).days + 1
+    else:
+        file_days = 28
+    start, end = date.fromisoformat(body["startDate"]), date.fromisoformat(body["endDate"])
+    dims = body.get("dimensions") or ["page", "query"]
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)] if "date" in dims else [None]
+    scale = (1 if "date" in dims else (end - start).days + 1) / max(file_days, 1)
+
+    impr = pd.to_numeric(df["impressions"], errors="coerce").fillna(0.0) * scale
+    clicks = pd.to_numeric(df["clicks"], errors="coerce").fillna(0.0) * scale
+    pos = pd.to_numeric(df["position"], errors="coerce").fillna(0.0)
+    rows = []
+    for d in days:
+        for i in range(len(df)):
+            keys = [d.isoformat() if dim == "date" else str(df[dim].iat[i]) for dim in dims]
+            im, cl = round(float(impr.iat[i]), 3), round(float(clicks.iat[i]), 3)
+            rows.append({"keys": keys, "impressions": im, "clicks": cl, "ctr": cl / im if im > 0 else 0.0, "position": float(pos.iat[i])})
+    first = int(body.get("startRow", 0))
+    page = rows[first:first + int(body.get("rowLimit", 25000))]
+    return {"rows": page} if page else {}
+
+
+def _sheet_values() -> list:
+    df = _csv(_settings["econ_csv"])
+    values = [list(df.columns)] + df.values.tolist()
+    # The API trims trailing empty cells
+    out = []
+    for row in values:
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        out.append(row)
+    return out
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch.upper()) - 64
+    return n
+
+
+def _value_range(rng: str) -> dict:
+    """Rows/columns of "<sheet>!A<r1>:<C><r2>" (r1 defaults to 1, missing r2 = to the end)."""
+    m = re.match(r"^(?:[^!]*!)?([A-Z]+)(\d*)(?::([A-Z]+)(\d*))?$", rng)
+    if not m:
+        raise RuntimeError(f"[REPLAY] Unsupported range: {rng}")
+    c1, r1, c2, r2 = m.group(1), int(m.group(2) or 1), m.group(3) or m.group(1), m.group(4)
+    values = _sheet_values()
+    rows = values[r1 - 1:int(r2) if r2 else None]
+    rows = [row[_col_index(c1) - 1:_col_index(c2)] for row in rows]
+    while rows and not rows[-1]:
+        rows.pop()
+    return {"range": rng, "majorDimension": "ROWS", **({"values": rows} if rows else {})}
+
+
+def _synthesize(api: str, method: str, kwargs: dict) -> Optional[dict]:
+    if api == "gsc" and method == "searchanalytics.query":
+        return _gsc_query(kwargs["body"])
+    if api == "sheets" and method == "spreadsheets.get":
+        return {"sheets": [{"properties": {"title": SYNTH_SHEET}}]}
+    if api == "sheets" and method == "spreadsheets.values.get":
+        return _value_range(kwargs["range"])
+    if api == "sheets" and method == "spreadsheets.values.batchGet":
+        return {"valueRanges": [_value_range(r) for r in kwargs["ranges"]]}
+    return None
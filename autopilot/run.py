@@ -3,22 +3,37 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta, timezone
 import os
+import zlib
 
 import pandas as pd
 
+from autopilot import replay
 from autopilot.config import load_config
-from autopilot.state_store import load_state, save_state, append_history
+from autopilot.state_store import load_state, save_state, append_history, compact_history, get_page_state, last_change, HISTORY_KEEP, STATE_PATH
+from autopilot.state_db import SqliteStateStore, DB_PATH
 from autopilot.policy import days_since_last_change, guardrail_check
-from autopilot.gsc_fetch import build_service as build_gsc_service, fetch_gsc_range
-from autopilot.gsc_loader import load_gsc_data
-from autopilot.intent import detect_dominant_intent
+from autopilot.fetch_stage import fetch_all
+from autopilot.gsc_loader import split_gsc_by_page
+from autopilot.intent import LABEL_CACHE_MAX, intent_scores, load_label_cache, save_label_cache
 from autopilot.templates import build_templates, pick_template_for_intent
-from autopilot.html_editor import apply_title_meta_slots
-from autopilot.build_dashboard import build_dashboard
-from autopilot.econ_fetch import fetch_econ_sheet_to_csv
-from autopilot.econ_loader import load_econ_clicks, count_outbound_clicks
-from autopilot.scoring import update_variant_aggregates, choose_best_variant, choose_best_intent
-from autopilot.cycle_log import utc_now_iso, append_jsonl, write_json
+from autopilot.html_editor import apply_title_meta_slots, has_title_meta_slots, read_title_meta_slots
+from autopilot.build_dashboard import build_dashboard, build_dashboards
+from autopilot.econ_loader import load_econ_clicks
+from autopilot.econ_rollup import needs_full_log, update_rollup, attribute_window
+from autopilot.scoring import record_observation
+from autopilot.decision import DecisionParams, decide
+from autopilot.sequential import add_evidence
+from autopilot.cycle_log import utc_now_iso, append_jsonl, read_json, write_json
+from autopilot.spans import Tracer, carried_span
+from autopilot.snapshots import write_csv, write_parquet, wait_pending, parquet_path, GSC_SCHEMA, ECON_SCHEMA
+
+
+CYCLES_PATH = "autopilot/logs/cycles.jsonl"
+LATEST_CYCLE_PATH = "autopilot/logs/latest_cycle.json"
+
+
+def _page_url(base_url: str, html_path: str) -> str:
+    return base_url.rstrip("/") + "/" + html_path.lstrip("/")
 
 
 def _parse_ts(ts: str) -> datetime:
@@ -26,11 +41,8 @@ def _parse_ts(ts: str) -> datetime:
 
 
 def _last_change_ts(state: dict) -> datetime | None:
-    hist = state.get("history", [])
-    for item in reversed(hist):
-        if item.get("changed_html") is True and item.get("timestamp_utc"):
-            return _parse_ts(item["timestamp_utc"])
-    return None
+    item = last_change(state)
+    return _parse_ts(item["timestamp_utc"]) if item else None
 
 
 def _ensure_state_schema(state: dict, cfg: dict) -> dict:
@@ -62,7 +74,7 @@ def _eval_window(state: dict, cfg: dict) -> tuple[date, date]:
     - end = yesterday
     This avoids mixing metrics across two variants in the same window.
     """
-    end = date.today() - timedelta(days=int(cfg.get('gsc_lag_days', 3)))
+    end = replay.today() - timedelta(days=int(cfg.get('gsc_lag_days', 3)))
     last = _last_change_ts(state)
     if not last:
         # fallback: last 28 days
@@ -74,95 +86,49 @@ def _eval_window(state: dict, cfg: dict) -> tuple[date, date]:
     return start, end
 
 
-def _variant_key(intent: str, idx: int) -> str:
-    return f"{intent}#{int(idx)}"
-
-
-
-
-def _intent_agg(variants: dict, intent: str) -> dict:
-    total_impr = 0.0
-    total_out = 0.0
-    total_gsc = 0.0
-    n_obs = 0
-    for k, v in (variants or {}).items():
-        k_intent = k.split("#")[0] if "#" in k else (v.get("intent") or "")
-        if k_intent != intent:
-            continue
-        s = (v.get("score_agg") or {})
-        total_impr += float(s.get("impressions", 0.0))
-        total_out += float(s.get("outbound_clicks", 0.0))
-        total_gsc += float(s.get("gsc_clicks", 0.0))
-        n_obs += int(s.get("n_obs", 0))
-    out_1k = 1000.0 * total_out / total_impr if total_impr > 0 else 0.0
-    return {"intent": intent, "impressions": total_impr, "outbound_clicks": total_out, "gsc_clicks": total_gsc, "n_obs": n_obs, "outbound_per_1k_impr": out_1k}
-def main():
-    cfg = load_config()
+def _page_configs(cfg: dict) -> list[dict]:
+    """Pages to run this cycle.
 
+    `pages` in config.json may list html paths or dicts with per-page overrides
+    (topic, city, year). Without it, the legacy single `html_path` is used.
+    """
+    pages = cfg.get("pages") or []
+    if not pages:
+        return [{"html_path": cfg["html_path"]}]
+    out = []
+    for p in pages:
+        out.append({"html_path": p} if isinstance(p, str) else dict(p))
+    return out
+
+
+def _rolling_window(lag_days: int, fallback_days: int) -> tuple[date, date]:
+    end = replay.today() - timedelta(days=lag_days)
+    return end - timedelta(days=fallback_days), end
+
+
+def _run_page(
+    cfg: dict,
+    page_cfg: dict,
+    state: dict,
+    df_page: pd.DataFrame,
+    econ: dict | None,
+    start_d: date,
+    end_d: date,
+    can_change: bool,
+    scores_by_intent: dict,
+) -> dict:
+    """Score, decide and apply for one page. Mutates `state` (the page state) and returns the cycle record.
+
+    `scores_by_intent` is intent.intent_scores() of `df_page` (timed as its own stage by main);
+    `econ` is this page's outbound clicks in the window (econ_rollup.attribute_window), None without econ data.
+    """
     base_url = cfg.get("base_url", "https://seine.travel/")
-    html_path = cfg["html_path"]
-    gsc_file = cfg.get("gsc_file", "data/gsc_latest.csv")
-    gsc_site_url = cfg.get("gsc_site_url", "sc-domain:seine.travel")
-    econ_sheet_id = cfg.get("econ_spreadsheet_id")
-    econ_csv = cfg.get("econ_csv", "data/econ_clicks_latest.csv")
-
-    min_impressions_to_change = int(cfg.get("min_impressions_to_change", 50))
-    guardrail_days = int(cfg.get("guardrail_days", 14))
-
-    eval_min_impressions = int(cfg.get("eval_min_impressions", 120))
-    eval_min_outbound = int(cfg.get("eval_min_outbound_clicks", 2))
-    rollback_drop_pct = float(cfg.get("rollback_drop_pct", 0.25))
-
-    prefer_best_intent = bool(cfg.get("prefer_best_intent", True))
-    intent_switch_margin_pct = float(cfg.get("intent_switch_margin_pct", 0.15))
-    best_intent_min_outbound = float(cfg.get("best_intent_min_outbound_clicks", 3))
+    html_path = page_cfg["html_path"]
 
-    topic = cfg.get("topic", "Seine River Cruises")
-    city = cfg.get("city", "Paris")
-    year = cfg.get("year", str(date.today().year))
+    topic = page_cfg.get("topic", cfg.get("topic", "Seine River Cruises"))
+    city = page_cfg.get("city", cfg.get("city", "Paris"))
+    year = page_cfg.get("year", cfg.get("year", str(replay.today().year)))
 
-    # ---------------- state + guardrail ----------------
-    state = load_state()
-    state = _ensure_state_schema(state, cfg)
-
-    days = days_since_last_change(state)
-    bypass = os.environ.get("BYPASS_GUARDRAIL", "0") == "1"
-    can_change = True
-    try:
-        guardrail_check(days, guardrail_days, bypass)
-    except SystemExit:
-        can_change = False
-
-    # ---------------- evaluation window ----------------
-    start_d, end_d = _eval_window(state, cfg)
-
-    # If we are inside guardrail, use a rolling window for dashboard/observability.
-    fallback_days = int(cfg.get("gsc_fallback_days", 28))
-    lag_days = int(cfg.get("gsc_lag_days", 3))
-
-    if not can_change:
-        end_d = date.today() - timedelta(days=lag_days)
-        start_d = end_d - timedelta(days=fallback_days)
-
-    # ---------------- fetch GSC for window ----------------
-    gsc_service = build_gsc_service()
-    df_gsc_raw = fetch_gsc_range(gsc_service, site_url=gsc_site_url, start_date=start_d, end_date=end_d)
-
-    # If GSC returns 0 rows (lag / narrow window), refetch rolling window for observability
-    if len(df_gsc_raw) == 0:
-        end2 = date.today() - timedelta(days=lag_days)
-        start2 = end2 - timedelta(days=fallback_days)
-        if (start2, end2) != (start_d, end_d):
-            print(f"[GSC] 0 rows for {start_d}..{end_d}. Refetching rolling window {start2}..{end2}.")
-            df_gsc_raw = fetch_gsc_range(gsc_service, site_url=gsc_site_url, start_date=start2, end_date=end2)
-            start_d, end_d = start2, end2
-
-    os.makedirs("data", exist_ok=True)
-    df_gsc_raw.to_csv(gsc_file, index=False)
-    print(f"[GSC] Saved {len(df_gsc_raw)} rows to {gsc_file} ({start_d}..{end_d})")
-
-    # Load and filter to target page
-    df_page = load_gsc_data(path=gsc_file, html_path=html_path, base_url=base_url)
     total_impr = float(df_page["impressions"].sum())
     total_clicks = float(df_page["clicks"].sum())
     avg_ctr = float(df_page["ctr"].mean()) if len(df_page) else 0.0
@@ -178,44 +144,20 @@ def main():
     except Exception:
         top_queries = []
 
-
-    # ---------------- fetch ECON clicks ----------------
-    econ_ok = False
+    # ---------------- ECON clicks for this page ----------------
+    econ_ok = econ is not None
     econ_total = 0
     econ_by_id = {}
-    if econ_sheet_id:
-        creds_json = os.environ.get("GSC_CREDENTIALS_JSON")
-        if not creds_json:
-            raise RuntimeError("Missing env var GSC_CREDENTIALS_JSON (needed for Sheets read scope)")
-        fetch_econ_sheet_to_csv(spreadsheet_id=econ_sheet_id, output_csv=econ_csv, creds_json=creds_json)
-        econ_df = load_econ_clicks(econ_csv)
-
-        page_url = base_url.rstrip("/") + "/" + html_path.lstrip("/")
-        start_ts = pd.Timestamp(datetime.combine(start_d, datetime.min.time(), tzinfo=timezone.utc))
-        end_ts = pd.Timestamp(datetime.combine(end_d, datetime.max.time(), tzinfo=timezone.utc))
-        econ = count_outbound_clicks(econ_df, page_url=page_url, start_utc=start_ts, end_utc=end_ts)
+    if econ_ok:
         econ_total = int(econ["outbound_clicks"])
         econ_by_id = econ.get("by_id", {})
-        econ_ok = True
-        print(f"[ECON] Outbound clicks for {page_url} in window: {econ_total}")
-    else:
-        print("[ECON] No econ_spreadsheet_id configured. Skipping econ fetch.")
+        print(f"[ECON] Outbound clicks for {_page_url(base_url, html_path)} in window: {econ_total}")
 
-    # ---------------- intent + candidate selection ----------------
-    dominant_intent = detect_dominant_intent(df_page)
-    templates = build_templates(topic=topic, city=city, year=year)
-
-    # Choose next template index for that intent
-    idx_by_intent = state.setdefault("template_index_by_intent", {})
-    current_idx = int(idx_by_intent.get(dominant_intent, 0)) % len(templates[dominant_intent])
-
-    # ---------------- score current active variant ----------------
+    # ---------------- observation for the active variant ----------------
     active = state.get("active_variant", {})
     active_key = active.get("variant_key") or state.get("active_variant_key") or "baseline"
 
     # store observation against active variant (de-dup by window)
-    v = state.setdefault("variants", {}).setdefault(active_key, {})
-    obs = v.setdefault("observations", [])
     new_obs = {
         "window": {"start": start_d.isoformat(), "end": end_d.isoformat()},
         "metrics": {
@@ -228,102 +170,48 @@ def main():
             "outbound_per_1k_impr": (1000.0 * econ_total / total_impr) if total_impr > 0 else 0.0,
         },
     }
-    replaced = False
-    for i in range(len(obs) - 1, -1, -1):
-        if obs[i].get("window") == new_obs["window"]:
-            obs[i] = new_obs
-            replaced = True
-            break
-    if not replaced:
-        obs.append(new_obs)
-
-    update_variant_aggregates(state)
-    best_key = choose_best_variant(state.get("variants", {}))
-    state["best_variant_key"] = best_key
-
-    # Current vs best for rollback
-    variants = state.get("variants", {})
-    cur_score = (variants.get(active_key, {}) or {}).get("score_agg", {})
-    best_score = (variants.get(best_key, {}) or {}).get("score_agg", {}) if best_key else {}
-
-    cur_out_1k = float(cur_score.get("outbound_per_1k_impr", 0.0))
-    best_out_1k = float(best_score.get("outbound_per_1k_impr", 0.0))
-    cur_out = float(cur_score.get("outbound_clicks", 0.0))
-    best_out = float(best_score.get("outbound_clicks", 0.0))
-    cur_impr = float(cur_score.get("impressions", 0.0))
-
-    enough_to_eval = (cur_impr >= eval_min_impressions) and (cur_out >= eval_min_outbound)
-    best_is_better = (best_key is not None) and (best_key != active_key) and (best_out_1k > 0)
-
-    do_rollback = False
-    if can_change and enough_to_eval and best_is_better:
-        drop = 1.0 - (cur_out_1k / best_out_1k) if best_out_1k > 0 else 0.0
-        if drop >= rollback_drop_pct and best_out >= eval_min_outbound:
-            do_rollback = True
-
-    action = "hold"
-    chosen_intent = dominant_intent
-    chosen_idx = current_idx
+    record_observation(state, active_key, new_obs)
+    # sprt evidence: only windows that start after the last HTML change (no days of the previous variant)
+    last = _last_change_ts(state)
+    if last is None or start_d > last.date():
+        add_evidence(state, active_key, new_obs)
+
+    # ---------------- decide (pure) + apply ----------------
+    templates = build_templates(topic=topic, city=city, year=year)
+    pool_sizes = {i: len(t) for i, t in templates.items()}
+    # Same page + window -> same bandit draw, so a re-run of a cycle decides the same way
+    seed = zlib.crc32(f"{html_path}|{start_d.isoformat()}|{end_d.isoformat()}".encode())
+    d = decide(state, total_impr, scores_by_intent, pool_sizes, DecisionParams.from_config(cfg), can_change, seed=seed)
+    delta = d["state_delta"]
+    state["best_variant_key"] = delta["best_variant_key"]
+    if "sequential_test" in delta:
+        state["sequential_test"] = delta["sequential_test"]
+
+    action, can_change = d["action"], d["can_change"]
+    dominant_intent, chosen_intent, chosen_idx = d["dominant_intent"], d["chosen_intent"], d["chosen_idx"]
+    best_key = d["best_variant_key"]
     chosen_title = None
     chosen_meta = None
     changed = False
 
-    if total_impr < min_impressions_to_change:
-        action = "hold_not_enough_impressions"
-        can_change = False
-
-    if can_change:
-        if do_rollback and best_key:
-            # Best key format: intent#idx (or 'baseline')
-            action = "rollback"
-            if "#" in best_key:
-                chosen_intent, idx_s = best_key.split("#", 1)
-                chosen_idx = int(idx_s)
-                chosen_title, chosen_meta = pick_template_for_intent(templates[chosen_intent], chosen_idx)
-            else:
-                # baseline rollback
-                chosen_title = state.get("baseline", {}).get("title", "")
-                chosen_meta = state.get("baseline", {}).get("meta", "")
+    if "active_variant_key" in delta:
+        if d["rollback_to_baseline"]:
+            chosen_title = state.get("baseline", {}).get("title", "")
+            chosen_meta = state.get("baseline", {}).get("meta", "")
         else:
-            action = "explore"
-
-            # Prefer an intent that has proven better ECON performance, but only when evidence exists.
-            if prefer_best_intent:
-                intent_best = choose_best_intent(state.get("variants", {}))
-                if intent_best and intent_best.get("intent") and intent_best.get("intent") != dominant_intent:
-                    if float(intent_best.get("outbound_clicks", 0.0)) >= best_intent_min_outbound:
-                        dom_stats = _intent_agg(state.get("variants", {}), dominant_intent)
-                        dom_out_1k = float(dom_stats.get("outbound_per_1k_impr", 0.0))
-                        best_out_1k = float(intent_best.get("outbound_per_1k_impr", 0.0))
-                        if dom_out_1k <= 0 and best_out_1k > 0:
-                            chosen_intent = intent_best["intent"]
-                        elif best_out_1k > dom_out_1k * (1.0 + intent_switch_margin_pct):
-                            chosen_intent = intent_best["intent"]
-
-            # Recompute index for the chosen intent (pool is tiny: 2 templates per intent)
-            chosen_idx = int(idx_by_intent.get(chosen_intent, 0)) % len(templates[chosen_intent])
             chosen_title, chosen_meta = pick_template_for_intent(templates[chosen_intent], chosen_idx)
+        changed = apply_title_meta_slots(html_path=html_path, title=chosen_title, meta=chosen_meta)
 
-        if chosen_title is not None and chosen_meta is not None:
-            changed = apply_title_meta_slots(html_path=html_path, title=chosen_title, meta=chosen_meta)
-
-            # advance index only when exploring (rollback keeps the winner)
-            if action == "explore":
-                idx_by_intent[chosen_intent] = (chosen_idx + 1) % len(templates[chosen_intent])
-            else:
-                idx_by_intent[chosen_intent] = int(chosen_idx)
-
-            # update active variant
-            new_key = _variant_key(chosen_intent, chosen_idx) if action != "hold" else active_key
-            state["active_variant_key"] = new_key
-            state["active_variant"] = {
-                "variant_key": new_key,
-                "intent": chosen_intent,
-                "template_index": int(chosen_idx),
-                "title": chosen_title,
-                "meta": chosen_meta,
-                "applied_at_utc": utc_now_iso(),
-            }
+        state.setdefault("template_index_by_intent", {}).update(delta.get("template_index_by_intent", {}))
+        state["active_variant_key"] = delta["active_variant_key"]
+        state["active_variant"] = {
+            "variant_key": delta["active_variant_key"],
+            "intent": "baseline" if d["rollback_to_baseline"] else chosen_intent,
+            "template_index": int(chosen_idx),
+            "title": chosen_title,
+            "meta": chosen_meta,
+            "applied_at_utc": utc_now_iso(),
+        }
 
     # ---------------- history + logs ----------------
     cycle = {
@@ -331,6 +219,7 @@ def main():
         "window": {"start": start_d.isoformat(), "end": end_d.isoformat()},
         "page": html_path,
         "dominant_intent": dominant_intent,
+        "intent_scores": scores_by_intent,
         "top_queries": top_queries,
         "action": action,
         "can_change": can_change,
@@ -353,28 +242,266 @@ def main():
             "outbound_per_1k_impr": (1000.0 * econ_total / total_impr) if total_impr > 0 else 0.0,
         },
         "best_variant_key": best_key,
-        "scores": {
-            "current_outbound_per_1k_impr": cur_out_1k,
-            "best_outbound_per_1k_impr": best_out_1k,
-        },
+        "scores": d["scores"],
     }
+    if "bandit" in d:
+        cycle["bandit"] = d["bandit"]
+    if "sequential_test" in d:
+        cycle["sequential_test"] = d["sequential_test"]
 
     append_history(state, {"timestamp_utc": cycle["timestamp_utc"], "action": action, "changed_html": changed, **cycle})
-    save_state(state)
+    print(f"[{html_path}] action={action} intent={dominant_intent} can_change={can_change} changed={changed}")
+    return cycle
 
-    # observability artifacts
-    append_jsonl("autopilot/logs/cycles.jsonl", cycle)
-    write_json("autopilot/logs/latest_cycle.json", cycle)
-    # dashboard + human-readable summary
-    build_dashboard(
-        cycles_path="autopilot/logs/cycles.jsonl",
-        state_path="autopilot/state.json",
-        output_html="dashboard/index.html",
-        output_md="autopilot/logs/latest_cycle.md",
-    )
 
-    print(f"Done. action={action} intent={dominant_intent} can_change={can_change} changed={changed}")
+def main():
+    cfg = load_config()
+    # live / record (save API responses as fixtures) / replay (serve them, no network)
+    api_mode = replay.configure(cfg)
+    if api_mode != "live":
+        print(f"[REPLAY] api_mode={api_mode} fixtures={cfg.get('fixtures_dir', replay.FIXTURES_DIR)} today={replay.today()}")
+
+    base_url = cfg.get("base_url", "https://seine.travel/")
+    gsc_file = cfg.get("gsc_file", "data/gsc_latest.csv")
+    gsc_site_url = cfg.get("gsc_site_url", "sc-domain:seine.travel")
+    econ_sheet_id = cfg.get("econ_spreadsheet_id")
+    econ_csv = cfg.get("econ_csv", "data/econ_clicks_latest.csv")
 
+    guardrail_days = int(cfg.get("guardrail_days", 14))
+    fallback_days = int(cfg.get("gsc_fallback_days", 28))
+    lag_days = int(cfg.get("gsc_lag_days", 3))
+
+    pages = _page_configs(cfg)
+    multi_page = bool(cfg.get("pages"))
+    primary_html = cfg.get("html_path") or pages[0]["html_path"]
+
+    # Per-stage timings (tracemalloc peak memory only when asked for: it slows the run)
+    tracer = Tracer(track_memory=bool(cfg.get("trace_memory", False)) or os.environ.get("AUTOPILOT_TRACE_MEMORY", "0") == "1")
+    # The dashboard is rendered after the cycle is logged: its timing is carried into the next cycle.
+    prev_dashboard = carried_span(((read_json(LATEST_CYCLE_PATH) or {}).get("stage_timings")), "dashboard")
+    if prev_dashboard:
+        tracer.add(prev_dashboard)
+
+    # ---------------- state + guardrail (per page) ----------------
+    with tracer.span("state_load") as sp:
+        keep = int(cfg.get("history_keep", HISTORY_KEEP))
+        store = None
+        state = None
+        if cfg.get("state_backend", "json") == "sqlite":
+            store = SqliteStateStore(cfg.get("state_db", DB_PATH))
+            if store.is_empty() and os.path.exists(STATE_PATH):
+                store.import_json_state(load_state(), legacy_html_path=cfg.get("html_path"))
+        else:
+            state = load_state()
+        bypass = os.environ.get("BYPASS_GUARDRAIL", "0") == "1"
+
+        runs = []
+        for page_cfg in pages:
+            html_path = page_cfg["html_path"]
+            if store is not None:
+                ps = store.load_page(html_path, history_tail=keep)
+            elif multi_page:
+                ps = get_page_state(state, html_path, legacy_html_path=cfg.get("html_path"))
+            else:
+                ps = state
+            # Checked for every page before anything is written: a page without slots is only observed
+            has_slots = has_title_meta_slots(html_path)
+            if not has_slots:
+                print(f"[AUTOPILOT] {html_path}: no AUTOPILOT TITLE/META slots. Holding (the page is never edited).")
+            if (multi_page or store is not None) and not ps.get("baseline") and has_slots:
+                ps["baseline"] = read_title_meta_slots(html_path)
+            ps = _ensure_state_schema(ps, cfg)
+
+            days = days_since_last_change(ps)
+            can_change = has_slots
+            try:
+                guardrail_check(days, guardrail_days, bypass)
+            except SystemExit:
+                can_change = False
+
+            # ---------------- evaluation window ----------------
+            start_d, end_d = _eval_window(ps, cfg)
+
+            # If we are inside guardrail, use a rolling window for dashboard/observability.
+            if not can_change:
+                start_d, end_d = _rolling_window(lag_days, fallback_days)
+
+            runs.append({"page_cfg": page_cfg, "state": ps, "window": (start_d, end_d), "can_change": can_change})
+        sp["rows"] = len(runs)
+
+    # ---------------- fetch GSC + ECON concurrently ----------------
+    creds_json = None
+    if econ_sheet_id:
+        creds_json = os.environ.get("GSC_CREDENTIALS_JSON")
+        if not creds_json and api_mode != "replay":
+            raise RuntimeError("Missing env var GSC_CREDENTIALS_JSON (needed for Sheets read scope)")
+    else:
+        print("[ECON] No econ_spreadsheet_id configured. Skipping econ fetch.")
+
+    # CSV snapshots are side outputs for humans; the cycle itself works on in-memory frames.
+    # The incremental econ sync keeps its snapshot (it holds the rows of earlier runs).
+    csv_snapshots = bool(cfg.get("csv_snapshots", True))
+    parquet_snapshots = bool(cfg.get("parquet_snapshots", False))
+    background_snapshots = bool(cfg.get("snapshot_background", True))
+    econ_incremental = bool(cfg.get("econ_incremental", False))
+    if api_mode == "replay":
+        # data/*.csv are what replays are synthesized from: leave them as the live run wrote them
+        csv_snapshots = parquet_snapshots = econ_incremental = False
+    # Only new sheet rows are fetched and parsed: the rollup must hold the earlier ones
+    econ_resync = econ_incremental and bool(econ_sheet_id) and needs_full_log(cfg.get("econ_rollup"))
+    if econ_resync:
+        print("[ECON-ROLLUP] Rollup missing or from another version. Fetching the full sheet.")
+
+    rolling = _rolling_window(lag_days, fallback_days)
+    with tracer.span("fetch") as sp:
+        fetched = fetch_all(
+            site_url=gsc_site_url,
+            windows=[r["window"] for r in runs],
+            fallback_window=rolling,
+            econ_sheet_id=econ_sheet_id,
+            econ_csv=econ_csv if (csv_snapshots or econ_incremental) else None,
+            creds_json=creds_json,
+            store_dir=cfg.get("gsc_store_dir"),
+            lag_days=lag_days,
+            econ_incremental=econ_incremental and not econ_resync,
+            background_snapshots=background_snapshots,
+        )
+        sp["rows"] = sum(len(df) for df in fetched["gsc"].values())
+    if api_mode == "record":
+        replay.prune(int(cfg.get("fixtures_keep", 60)))
+    raw_by_window: dict[tuple[date, date], pd.DataFrame] = fetched["gsc"]
+
+    for r in runs:
+        window = r["window"]
+        # If GSC returns 0 rows (lag / narrow window), use the rolling window for observability
+        if len(raw_by_window[window]) == 0 and window != rolling:
+            print(f"[GSC] 0 rows for {window[0]}..{window[1]}. Using rolling window {rolling[0]}..{rolling[1]}.")
+            r["window"] = rolling
+
+    used_windows = list(dict.fromkeys(r["window"] for r in runs))
+    if csv_snapshots or parquet_snapshots:
+        with tracer.span("gsc_snapshot") as sp:
+            df_gsc_raw = pd.concat([raw_by_window[w] for w in used_windows], ignore_index=True)
+            if csv_snapshots:
+                write_csv(df_gsc_raw, gsc_file, background=background_snapshots)
+            if parquet_snapshots:
+                write_parquet(df_gsc_raw, parquet_path(gsc_file), GSC_SCHEMA, background=background_snapshots)
+            sp["rows"] = len(df_gsc_raw)
+        print(f"[GSC] Snapshot of {len(df_gsc_raw)} rows -> {gsc_file} ({len(used_windows)} window(s))")
+
+    # Split each window's rows per page in one pass
+    with tracer.span("split_pages") as sp:
+        df_by_page: dict[str, pd.DataFrame] = {}
+        for window in used_windows:
+            html_paths = [r["page_cfg"]["html_path"] for r in runs if r["window"] == window]
+            df_by_page.update(split_gsc_by_page(raw_by_window[window], html_paths, base_url))
+        sp["rows"] = sum(len(df) for df in df_by_page.values())
+
+    econ_cube = None
+    econ_ts_parse = None
+    if fetched["econ_df"] is not None:
+        with tracer.span("econ_rollup") as sp:
+            # Only the sheet rows after the rollup's offset (all of them after a full fetch)
+            econ_raw = fetched["econ_df"]
+            econ_offset = int(econ_raw.attrs.get("offset", 0))
+            econ_clicks = load_econ_clicks(econ_raw)
+            econ_cube = update_rollup(econ_clicks, path=cfg.get("econ_rollup"), offset=econ_offset, n_rows=len(econ_raw))
+            sp["rows"] = len(econ_clicks)
+            econ_ts_parse = econ_clicks.attrs.get("ts_parse")
+        if parquet_snapshots:
+            write_parquet(econ_clicks, parquet_path(econ_csv), ECON_SCHEMA, background=background_snapshots, append=econ_offset > 0)
+
+    # Outbound clicks of every page: one attribution pass per distinct window
+    econ_by_page: dict[str, dict] = {}
+    if econ_cube is not None:
+        with tracer.span("econ_attribution") as sp:
+            for window in used_windows:
+                urls = {r["page_cfg"]["html_path"]: _page_url(base_url, r["page_cfg"]["html_path"]) for r in runs if r["window"] == window}
+                clicks = attribute_window(econ_cube, list(urls.values()), window[0], window[1])
+                econ_by_page.update({h: clicks[u] for h, u in urls.items()})
+            sp["rows"] = len(econ_cube)
+
+    # ---------------- decide + apply per page ----------------
+    intent_cache_path = cfg.get("intent_cache")
+    intent_cache = load_label_cache(intent_cache_path)
+    cycles = []
+    for r in runs:
+        html_path = r["page_cfg"]["html_path"]
+        start_d, end_d = r["window"]
+        df_page = df_by_page[html_path]
+        with tracer.span("intent") as sp:
+            scores_by_intent = intent_scores(df_page, lexicon=cfg.get("intent_lexicon"), cache=intent_cache)
+            sp["rows"] = len(df_page)
+        with tracer.span("decide") as sp:
+            if store is not None:
+                store.load_window_observations(r["state"], html_path, {"start": start_d.isoformat(), "end": end_d.isoformat()})
+            cycle = _run_page(
+                cfg, r["page_cfg"], r["state"], df_page, econ_by_page.get(html_path),
+                start_d, end_d, r["can_change"], scores_by_intent,
+            )
+            sp["rows"] = 1
+        cycle["fetch_timings"] = fetched["timings"]
+        if econ_ts_parse:
+            cycle["econ_ts_parse"] = econ_ts_parse
+        cycles.append(cycle)
+
+    with tracer.span("state_save") as sp:
+        if store is not None:
+            with store.conn:
+                for r in runs:
+                    store.save_page(r["page_cfg"]["html_path"], r["state"])
+            store.close()
+        else:
+            for r in runs:
+                compact_history(r["state"], keep=keep)
+            save_state(state)
+        save_label_cache(intent_cache_path, intent_cache, int(cfg.get("intent_cache_max_entries", LABEL_CACHE_MAX)))
+        sp["rows"] = len(runs)
+
+    # background CSV snapshots must be on disk before the run ends
+    with tracer.span("snapshot_wait"):
+        wait_pending()
+
+    # observability artifacts
+    stage_timings = tracer.to_dict()
+    for cycle in cycles:
+        cycle["stage_timings"] = stage_timings
+        append_jsonl(CYCLES_PATH, cycle, max_segment_bytes=cfg.get("cycle_log_segment_bytes"))
+    # dashboard + human-readable summary
+    with tracer.span("dashboard") as sp:
+        if multi_page:
+            # the primary page's summary is copied to latest_cycle.md, not rendered twice
+            build_dashboards(
+                [r["page_cfg"]["html_path"] for r in runs],
+                cycles_path=CYCLES_PATH,
+                state_path="autopilot/state.json",
+                output_dir=cfg.get("dashboard_dir", "dashboard"),
+                state_db=store.path if store is not None else None,
+                config=cfg,
+                primary=primary_html,
+                primary_md="autopilot/logs/latest_cycle.md",
+            )
+        else:
+            build_dashboard(
+                cycles_path=CYCLES_PATH,
+                state_path="autopilot/state.json",
+                output_html="dashboard/index.html",
+                output_md="autopilot/logs/latest_cycle.md",
+                page=primary_html if store is not None else None,
+                config=cfg,
+                state_db=store.path if store is not None else None,
+            )
+        sp["rows"] = len(runs)
+    tracer.stop()
+
+    # latest_cycle.json also carries this run's dashboard span (picked up by the next cycle)
+    latest = next((c for c in cycles if c["page"] == primary_html), cycles[-1])
+    write_json(LATEST_CYCLE_PATH, {**latest, "stage_timings": tracer.to_dict()})
+
+    slowest = max(stage_timings["spans"], key=lambda r: r["wall_seconds"], default=None)
+    if slowest:
+        print(f"[TIMING] total={stage_timings['total_wall_seconds']}s slowest={slowest['name']} ({slowest['wall_seconds']}s)")
+    print(f"Done. pages={len(cycles)} actions={[c['action'] for c in cycles]}")
 
 if __name__ == "__main__":
     main()
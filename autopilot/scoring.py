@@ -32,57 +32,139 @@ def choose_best_variant(variants: Dict[str, dict]) -> Optional[str]:
     return best_key
 
 
+AGG_FIELDS = ("impressions", "gsc_clicks", "outbound_clicks")
+
+
+def window_key(window: dict) -> str:
+    return f"{window.get('start')}..{window.get('end')}"
+
+
+def variant_intent(key: str, v: dict) -> Optional[str]:
+    """Intent a variant belongs to; None for the baseline (not an intent)."""
+    intent = (v.get("intent") or "").strip()
+    if intent:
+        return intent
+    return key.split("#")[0] if "#" in key else None
+
+
+def _empty_agg() -> dict:
+    return {"impressions": 0.0, "gsc_clicks": 0.0, "outbound_clicks": 0.0, "outbound_per_1k_impr": 0.0, "n_obs": 0}
+
+
+def _add(agg: dict, metrics: dict, n_obs: int) -> None:
+    """Add (n_obs=+1) or remove (n_obs=-1) one observation's metrics.
+
+    Also used to fold a whole variant total (n_obs=its count) into an intent.
+    """
+    sign = 1 if n_obs >= 0 else -1
+    for f in AGG_FIELDS:
+        agg[f] = float(agg.get(f, 0.0)) + sign * float(metrics.get(f, 0.0))
+    agg["n_obs"] = int(agg.get("n_obs", 0)) + n_obs
+    impr = agg["impressions"]
+    agg["outbound_per_1k_impr"] = 1000.0 * agg["outbound_clicks"] / impr if impr > 0 else 0.0
+
+
+def _observations_by_window(v: dict) -> dict:
+    """Observations keyed by window; migrates the legacy list layout in place."""
+    obs = v.get("observations")
+    if isinstance(obs, list):
+        obs = {window_key(o.get("window") or {}): o for o in obs}
+        v["observations"] = obs
+    return v.setdefault("observations", {})
+
+
 def update_variant_aggregates(state: dict) -> None:
-    """Aggregate observations per variant into a stable score."""
+    """Full recompute of per-variant and per-intent totals from observations.
+
+    Only needed to migrate or repair a state; record_observation keeps the
+    totals up to date incrementally afterwards.
+    """
     variants = state.setdefault("variants", {})
+    intent_agg: dict = {}
     for k, v in variants.items():
-        obs = v.get("observations", [])
-        total_impr = 0.0
-        total_gsc_clicks = 0.0
-        total_outbound = 0.0
-        for o in obs:
-            m = o.get("metrics", {})
-            total_impr += float(m.get("impressions", 0.0))
-            total_gsc_clicks += float(m.get("gsc_clicks", 0.0))
-            total_outbound += float(m.get("outbound_clicks", 0.0))
-
-        outbound_per_1k = 0.0
-        if total_impr > 0:
-            outbound_per_1k = 1000.0 * total_outbound / total_impr
-
-        v["score_agg"] = {
-            "impressions": total_impr,
-            "gsc_clicks": total_gsc_clicks,
-            "outbound_clicks": total_outbound,
-            "outbound_per_1k_impr": outbound_per_1k,
-            "n_obs": len(obs),
-        }
-
-
-def choose_best_intent(variants: Dict) -> Optional[dict]:
-    """Aggregate variant scores by intent and return best intent summary.
+        agg = _empty_agg()
+        for o in _observations_by_window(v).values():
+            _add(agg, o.get("metrics", {}), +1)
+        v["score_agg"] = agg
+        intent = variant_intent(k, v)
+        if intent:
+            ia = intent_agg.setdefault(intent, _empty_agg())
+            _add(ia, agg, agg["n_obs"])
+    state["intent_agg"] = intent_agg
 
-    Returns dict with keys: intent, outbound_per_1k_impr, outbound_clicks, impressions, n_obs
+
+def ensure_aggregates(state: dict) -> None:
+    """Build running totals once for states written before they existed."""
+    variants = state.get("variants") or {}
+    if "intent_agg" not in state or any(isinstance(v.get("observations"), list) for v in variants.values()):
+        update_variant_aggregates(state)
+
+
+def record_observation(state: dict, variant_key: str, obs: dict) -> bool:
+    """Add (or replace, same window) an observation and update running totals.
+
+    Cost is independent of how many variants/observations exist. Returns True
+    when an observation for that window was replaced.
     """
-    if not variants:
-        return None
+    ensure_aggregates(state)
+    v = state.setdefault("variants", {}).setdefault(variant_key, {})
+    by_window = _observations_by_window(v)
+    agg = v.setdefault("score_agg", _empty_agg())
+    intent = variant_intent(variant_key, v)
+    ia = state["intent_agg"].setdefault(intent, _empty_agg()) if intent else None
 
-    agg = {}
-    for k, v in variants.items():
-        intent = (v.get("intent") or "").strip() or (k.split("#")[0] if "#" in k else "unknown")
+    wk = window_key(obs.get("window") or {})
+    old = by_window.get(wk)
+    if old is not None:
+        _add(agg, old.get("metrics", {}), -1)
+        if ia is not None:
+            _add(ia, old.get("metrics", {}), -1)
+    by_window[wk] = obs
+    _add(agg, obs.get("metrics", {}), +1)
+    if ia is not None:
+        _add(ia, obs.get("metrics", {}), +1)
+    return old is not None
+
+
+def _sum_variants(variants: Dict) -> dict:
+    """Per-intent totals summed from the variants' score_agg (states without running intent_agg)."""
+    intent_agg: dict = {}
+    for k, v in (variants or {}).items():
+        intent = variant_intent(k, v)
+        if not intent:
+            continue
         s = v.get("score_agg") or {}
-        agg.setdefault(intent, {"impressions": 0.0, "outbound_clicks": 0.0, "gsc_clicks": 0.0, "n_obs": 0})
-        agg[intent]["impressions"] += float(s.get("impressions", 0.0))
-        agg[intent]["outbound_clicks"] += float(s.get("outbound_clicks", 0.0))
-        agg[intent]["gsc_clicks"] += float(s.get("gsc_clicks", 0.0))
-        agg[intent]["n_obs"] += int(s.get("n_obs", 0))
+        _add(intent_agg.setdefault(intent, _empty_agg()), s, int(s.get("n_obs", 0)))
+    return intent_agg
+
+
+def intent_summary(state: dict, intent: str) -> dict:
+    """Totals of one intent: the running intent_agg, or the variants summed when the state has none
+    (the same fallback as choose_best_intent, so both sides of a comparison agree)."""
+    intent_agg = state.get("intent_agg")
+    if intent_agg is None:
+        intent_agg = _sum_variants(state.get("variants"))
+    a = intent_agg.get(intent) or _empty_agg()
+    return {"intent": intent, **a}
+
+
+def choose_best_intent(variants: Dict, intent_agg: Optional[Dict] = None) -> Optional[dict]:
+    """Aggregate variant scores by intent and return best intent summary.
+
+    Uses the running `intent_agg` totals when given, otherwise sums variants.
+    Returns dict with keys: intent, outbound_per_1k_impr, outbound_clicks, impressions, n_obs
+    """
+    if intent_agg is None:
+        if not variants:
+            return None
+        intent_agg = _sum_variants(variants)
 
     best = None
-    for intent, a in agg.items():
-        impr = a["impressions"]
-        out = a["outbound_clicks"]
+    for intent, a in intent_agg.items():
+        impr = float(a.get("impressions", 0.0))
+        out = float(a.get("outbound_clicks", 0.0))
         out_1k = 1000.0 * out / impr if impr > 0 else 0.0
-        row = {"intent": intent, "outbound_per_1k_impr": out_1k, "outbound_clicks": out, "impressions": impr, "n_obs": a["n_obs"], "gsc_clicks": a["gsc_clicks"]}
+        row = {"intent": intent, "outbound_per_1k_impr": out_1k, "outbound_clicks": out, "impressions": impr, "n_obs": int(a.get("n_obs", 0)), "gsc_clicks": float(a.get("gsc_clicks", 0.0))}
         if best is None:
             best = row
         else:
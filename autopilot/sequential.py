@@ -0,0 +1,66 @@
+# autopilot/sequential.py
+"""Sequential probability ratio test for rollback (config "rollback_test": "sprt").
+
+Is the active variant's outbound click rate `drop` (rollback_drop_pct) below
+the best variant's? Conditional on the total clicks of the two, the active
+variant's share is Binomial(n, p) with
+
+    H0 (same rate):        p0 = I_cur / (I_cur + I_best)
+    H1 (rate x (1-drop)):  p1 = (1-drop) I_cur / ((1-drop) I_cur + I_best)
+
+The log-likelihood ratio of H1 vs H0 is re-evaluated every cycle; Wald's
+bounds keep the error rates at about alpha (rolling back a variant that is not
+worse) and beta (keeping a real loser) no matter how often it is checked, as
+long as every click is counted once. The variant aggregates can't be used for
+that: during guardrail holds they collect overlapping 28-day rolling windows,
+some reaching into the previous variant's days. The test reads its own totals
+instead (state["sprt_evidence"], see add_evidence): only windows that start
+after the last HTML change, each day counted once.
+
+Once a boundary is crossed the decision is final for that variant: decision
+stores it in state["sequential_test"] until the next HTML change.
+"""
+from __future__ import annotations
+
+import math
+
+
+def add_evidence(state: dict, variant_key: str, obs: dict) -> bool:
+    """Add an observation's window to the variant's test totals unless it overlaps what is counted.
+
+    Only call it for windows that start after the last HTML change. Returns
+    True when the window was counted.
+    """
+    w = obs.get("window") or {}
+    ev = state.setdefault("sprt_evidence", {}).setdefault(variant_key, {"impressions": 0.0, "outbound_clicks": 0.0, "windows": 0, "last_end": ""})
+    if not w.get("start") or w["start"] <= ev["last_end"]:
+        return False
+    m = obs.get("metrics") or {}
+    ev["impressions"] += float(m.get("impressions", 0.0))
+    ev["outbound_clicks"] += float(m.get("outbound_clicks", 0.0))
+    ev["windows"] += 1
+    ev["last_end"] = w["end"]
+    return True
+
+
+def sprt_bounds(alpha: float, beta: float) -> tuple[float, float]:
+    """(lower, upper): keep at or below lower, roll back at or above upper."""
+    return math.log(beta / (1.0 - alpha)), math.log((1.0 - beta) / alpha)
+
+
+def sprt_drop(x_cur: float, i_cur: float, x_best: float, i_best: float, drop: float, alpha: float = 0.05, beta: float = 0.2) -> dict:
+    """Test record with decision "rollback", "keep" or "continue" (not enough evidence yet)."""
+    lower, upper = sprt_bounds(alpha, beta)
+    rec = {"test": "sprt", "drop": drop, "alpha": alpha, "beta": beta, "lower": round(lower, 4), "upper": round(upper, 4),
+           "x_cur": x_cur, "i_cur": i_cur, "x_best": x_best, "i_best": i_best, "llr": 0.0, "decision": "continue"}
+    if i_cur <= 0 or i_best <= 0 or not 0.0 < drop < 1.0:
+        return rec
+    p0 = i_cur / (i_cur + i_best)
+    p1 = (1.0 - drop) * i_cur / ((1.0 - drop) * i_cur + i_best)
+    llr = x_cur * math.log(p1 / p0) + x_best * math.log((1.0 - p1) / (1.0 - p0))
+    rec["llr"] = round(llr, 4)
+    if llr >= upper:
+        rec["decision"] = "rollback"
+    elif llr <= lower:
+        rec["decision"] = "keep"
+    return rec
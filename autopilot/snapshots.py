@@ -0,0 +1,121 @@
+# autopilot/snapshots.py
+"""Data snapshots written off the critical path.
+
+CSV snapshots are for humans. Parquet snapshots (config "parquet_snapshots",
+off by default; needs pyarrow, which is not in requirements.txt) carry an
+explicit schema: categorical strings, float32 metrics and UTC timestamps, so a
+reader (gsc_loader / econ_loader with a .parquet path) gets typed columns back
+without re-inferring or re-parsing, and can read only the columns/rows it
+needs. They are for local analysis: the cycle itself never reads them, and
+data/*.parquet is kept out of git.
+
+Writes go through a single background thread so they keep their submission
+order (a full rewrite is never overtaken by a later append). Call wait_pending()
+before the process exits.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (parquet engine)
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+# Column -> dtype; columns missing from a frame are skipped
+GSC_SCHEMA = {
+    "page": "category",
+    "query": "category",
+    "impressions": "float32",
+    "clicks": "float32",
+    "ctr": "float32",
+    "position": "float32",
+    "startDate": "category",
+    "endDate": "category",
+}
+ECON_SCHEMA = {
+    "ts": "datetime64[ns, UTC]",
+    "id": "category",
+    "ref": "category",
+    "ua": "category",
+}
+
+_writer: Optional[ThreadPoolExecutor] = None
+_pending: List[Future] = []
+
+
+def submit(fn: Callable, *args, background: bool = True, **kwargs) -> None:
+    """Run `fn` now, or queue it on the writer thread when `background`."""
+    global _writer
+    if not background:
+        fn(*args, **kwargs)
+        return
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+    _pending.append(_writer.submit(fn, *args, **kwargs))
+
+
+def _to_csv(df: pd.DataFrame, path: str, append: bool) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    df.to_csv(path, mode="a" if append else "w", header=not append, index=False)
+
+
+def write_csv(df: pd.DataFrame, path: str, background: bool = False, append: bool = False) -> None:
+    submit(_to_csv, df, path, append, background=background)
+
+
+def parquet_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    out = df.copy()
+    for col, dtype in schema.items():
+        if col not in out.columns:
+            continue
+        if dtype.startswith("datetime64"):
+            out[col] = pd.to_datetime(out[col], utc=True)
+        elif dtype == "category":
+            out[col] = out[col].astype(str).astype("category")
+        else:
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype(dtype)
+    return out
+
+
+def _to_parquet(df: pd.DataFrame, path: str, schema: dict, append: bool = False) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if append and os.path.exists(path):
+        df = pd.concat([pd.read_parquet(path, engine="pyarrow"), df], ignore_index=True)
+    tmp = path + ".tmp"
+    apply_schema(df, schema).to_parquet(tmp, index=False, engine="pyarrow")
+    os.replace(tmp, path)
+
+
+def write_parquet(df: pd.DataFrame, path: str, schema: dict, background: bool = False, append: bool = False) -> bool:
+    """Typed snapshot (`append`: rows added to the existing one); returns False
+    (nothing written) when pyarrow is not installed."""
+    if not HAVE_PARQUET:
+        print(f"[SNAPSHOT] pyarrow not installed. Skipping {path}")
+        return False
+    submit(_to_parquet, df, path, schema, append, background=background)
+    return True
+
+
+def read_parquet(path: str, columns: Optional[list] = None, filters: Optional[list] = None) -> pd.DataFrame:
+    """Read a typed snapshot: only `columns` (those present), rows matching pyarrow `filters`."""
+    if columns is not None:
+        import pyarrow.parquet as pq
+        present = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in present]
+    return pd.read_parquet(path, engine="pyarrow", columns=columns, filters=filters)
+
+
+def wait_pending() -> None:
+    """Block until every queued write is done (re-raises the first failure)."""
+    while _pending:
+        _pending.pop(0).result()
@@ -0,0 +1,70 @@
+# autopilot/spans.py
+"""Per-stage timers for one run.
+
+    tracer = Tracer(track_memory=True)
+    with tracer.span("fetch") as sp:
+        ...
+        sp["rows"] = len(df)
+
+Spans sharing a name (e.g. one per page) are merged: times and rows add up,
+peak memory is the max. Spans are meant to be sequential stages, not nested:
+tracemalloc has a single peak counter, reset at the start of each span.
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class Tracer:
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.spans: dict[str, dict] = {}
+        self._t0 = time.perf_counter()
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[dict]:
+        extra: dict = {}
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield extra
+        finally:
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            rec = self.spans.setdefault(name, {"name": name, "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+            rec["calls"] += 1
+            rec["wall_seconds"] = round(rec["wall_seconds"] + wall, 4)
+            rec["cpu_seconds"] = round(rec["cpu_seconds"] + cpu, 4)
+            if self.track_memory:
+                peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                rec["peak_mem_kb"] = max(rec.get("peak_mem_kb", 0.0), peak_kb)
+            if "rows" in extra:
+                rec["rows"] = rec.get("rows", 0) + int(extra["rows"])
+
+    def add(self, rec: dict) -> None:
+        """Record a span measured elsewhere (e.g. carried over from the previous run)."""
+        self.spans[rec["name"]] = dict(rec)
+
+    def to_dict(self) -> dict:
+        return {
+            "total_wall_seconds": round(time.perf_counter() - self._t0, 4),
+            "memory_tracked": self.track_memory,
+            "spans": list(self.spans.values()),
+        }
+
+    def stop(self) -> None:
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def carried_span(prev_timings: Optional[dict], name: str) -> Optional[dict]:
+    """Span `name` of the previous run's `stage_timings`, renamed "<name>@prev" (None if absent)."""
+    for rec in (prev_timings or {}).get("spans") or []:
+        if rec.get("name") == name:
+            return {**rec, "name": f"{name}@prev", "previous_run": True}
+    return None
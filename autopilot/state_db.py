@@ -0,0 +1,215 @@
+# autopilot/state_db.py
+"""SQLite state backend (config: "state_backend": "sqlite").
+
+Same per-page state dicts as the JSON backend, but stored in tables so a run
+only reads what it needs: variant aggregates, the observations of the current
+window, the tail of the history and the active variant of one page.
+
+Once imported, the database is the state of record: state.json is only read
+by the one-off import (when the database is empty) and is not written any
+more. The file has to persist between runs like state.json does, which is
+why the workflow commits autopilot/state.db; without it every run would start
+over from the stale state.json.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from typing import Optional
+
+from autopilot.scoring import AGG_FIELDS, ensure_aggregates, variant_intent, window_key
+from autopilot.state_store import PAGE_KEYS, HISTORY_KEEP, compact_history
+
+DB_PATH = "autopilot/state.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS active_variant (
+    page TEXT PRIMARY KEY,
+    variant_key TEXT,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variants (
+    page TEXT NOT NULL,
+    variant_key TEXT NOT NULL,
+    intent TEXT,
+    impressions REAL NOT NULL DEFAULT 0,
+    gsc_clicks REAL NOT NULL DEFAULT 0,
+    outbound_clicks REAL NOT NULL DEFAULT 0,
+    outbound_per_1k_impr REAL NOT NULL DEFAULT 0,
+    n_obs INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (page, variant_key)
+);
+CREATE INDEX IF NOT EXISTS idx_variants_page_intent ON variants (page, intent);
+CREATE TABLE IF NOT EXISTS observations (
+    page TEXT NOT NULL,
+    variant_key TEXT NOT NULL,
+    window_start TEXT NOT NULL,
+    window_end TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    PRIMARY KEY (page, variant_key, window_start, window_end)
+);
+CREATE INDEX IF NOT EXISTS idx_observations_page_window ON observations (page, window_start, window_end);
+CREATE TABLE IF NOT EXISTS history (
+    page TEXT NOT NULL,
+    timestamp_utc TEXT NOT NULL,
+    action TEXT,
+    changed_html INTEGER NOT NULL DEFAULT 0,
+    variant_key TEXT,
+    PRIMARY KEY (page, timestamp_utc)
+);
+CREATE INDEX IF NOT EXISTS idx_history_page_changed ON history (page, changed_html, timestamp_utc);
+"""
+
+# Page-state keys that live in their own tables rather than in pages.doc
+_TABLE_KEYS = ("variants", "history", "active_variant", "active_variant_key", "intent_agg")
+
+
+class SqliteStateStore:
+    def __init__(self, path: str = DB_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM pages LIMIT 1").fetchone() is None
+
+    # ---------------- reads ----------------
+    def load_page(self, page: str, history_tail: int = HISTORY_KEEP) -> dict:
+        """Per-page state without observations (see load_window_observations)."""
+        c = self.conn
+        row = c.execute("SELECT doc FROM pages WHERE page = ?", (page,)).fetchone()
+        ps = json.loads(row["doc"]) if row else {}
+
+        row = c.execute("SELECT variant_key, doc FROM active_variant WHERE page = ?", (page,)).fetchone()
+        if row:
+            ps["active_variant"] = json.loads(row["doc"])
+            ps["active_variant_key"] = row["variant_key"]
+
+        variants = {}
+        for r in c.execute("SELECT * FROM variants WHERE page = ?", (page,)):
+            v = {"score_agg": {f: float(r[f]) for f in AGG_FIELDS}}
+            v["score_agg"]["outbound_per_1k_impr"] = float(r["outbound_per_1k_impr"])
+            v["score_agg"]["n_obs"] = int(r["n_obs"])
+            if r["intent"] and "#" not in r["variant_key"]:
+                v["intent"] = r["intent"]
+            v["observations"] = {}
+            variants[r["variant_key"]] = v
+        ps["variants"] = variants
+
+        intent_agg = {}
+        for r in c.execute(
+            "SELECT intent, SUM(impressions) AS impressions, SUM(gsc_clicks) AS gsc_clicks, "
+            "SUM(outbound_clicks) AS outbound_clicks, SUM(n_obs) AS n_obs "
+            "FROM variants WHERE page = ? AND intent IS NOT NULL GROUP BY intent",
+            (page,),
+        ):
+            impr = float(r["impressions"])
+            intent_agg[r["intent"]] = {
+                "impressions": impr,
+                "gsc_clicks": float(r["gsc_clicks"]),
+                "outbound_clicks": float(r["outbound_clicks"]),
+                "outbound_per_1k_impr": 1000.0 * float(r["outbound_clicks"]) / impr if impr > 0 else 0.0,
+                "n_obs": int(r["n_obs"]),
+            }
+        ps["intent_agg"] = intent_agg
+
+        rows = c.execute(
+            "SELECT timestamp_utc, action, changed_html, variant_key FROM history "
+            "WHERE page = ? ORDER BY timestamp_utc DESC LIMIT ?",
+            (page, max(int(history_tail), 0)),
+        ).fetchall()
+        ps["history"] = [_history_row(r) for r in reversed(rows)]
+
+        # Latest real change, in case it is older than the loaded tail
+        r = c.execute(
+            "SELECT timestamp_utc, action FROM history WHERE page = ? AND changed_html = 1 "
+            "AND action != 'baseline_seed' ORDER BY timestamp_utc DESC LIMIT 1",
+            (page,),
+        ).fetchone()
+        if r:
+            ps.setdefault("history_summary", {})["last_change"] = {"timestamp_utc": r["timestamp_utc"], "action": r["action"]}
+        return ps
+
+    def load_window_observations(self, ps: dict, page: str, window: dict) -> None:
+        """Load the observations of one window (the only ones a cycle can replace)."""
+        for r in self.conn.execute(
+            "SELECT variant_key, metrics FROM observations WHERE page = ? AND window_start = ? AND window_end = ?",
+            (page, window["start"], window["end"]),
+        ):
+            v = ps.setdefault("variants", {}).setdefault(r["variant_key"], {"observations": {}})
+            v.setdefault("observations", {})[window_key(window)] = {"window": dict(window), "metrics": json.loads(r["metrics"])}
+
+    def pages(self) -> list[str]:
+        return [r["page"] for r in self.conn.execute("SELECT page FROM pages ORDER BY page")]
+
+    # ---------------- writes ----------------
+    def save_page(self, page: str, ps: dict) -> None:
+        """Upsert one page state; call inside `with store.conn:` for a transaction."""
+        c = self.conn
+        doc = {k: v for k, v in ps.items() if k not in _TABLE_KEYS}
+        c.execute("INSERT OR REPLACE INTO pages (page, doc) VALUES (?, ?)", (page, json.dumps(doc, ensure_ascii=False)))
+
+        av = ps.get("active_variant")
+        if av is not None:
+            c.execute(
+                "INSERT OR REPLACE INTO active_variant (page, variant_key, doc) VALUES (?, ?, ?)",
+                (page, ps.get("active_variant_key") or av.get("variant_key"), json.dumps(av, ensure_ascii=False)),
+            )
+
+        for k, v in (ps.get("variants") or {}).items():
+            s = v.get("score_agg") or {}
+            c.execute(
+                "INSERT OR REPLACE INTO variants (page, variant_key, intent, impressions, gsc_clicks, "
+                "outbound_clicks, outbound_per_1k_impr, n_obs) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    page, k, variant_intent(k, v),
+                    float(s.get("impressions", 0.0)), float(s.get("gsc_clicks", 0.0)),
+                    float(s.get("outbound_clicks", 0.0)), float(s.get("outbound_per_1k_impr", 0.0)),
+                    int(s.get("n_obs", 0)),
+                ),
+            )
+            obs = v.get("observations") or {}
+            for o in (obs.values() if isinstance(obs, dict) else obs):
+                w = o.get("window") or {}
+                c.execute(
+                    "INSERT OR REPLACE INTO observations (page, variant_key, window_start, window_end, metrics) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (page, k, w.get("start"), w.get("end"), json.dumps(o.get("metrics") or {}, ensure_ascii=False)),
+                )
+
+        for h in ps.get("history") or []:
+            if not h.get("timestamp_utc"):
+                continue
+            c.execute(
+                "INSERT OR IGNORE INTO history (page, timestamp_utc, action, changed_html, variant_key) VALUES (?, ?, ?, ?, ?)",
+                (page, h["timestamp_utc"], h.get("action"), 1 if h.get("changed_html") is True else 0, h.get("variant_key")),
+            )
+
+    def import_json_state(self, state: dict, legacy_html_path: Optional[str] = None) -> None:
+        """One-off migration of a JSON state (single- or multi-page layout)."""
+        pages = dict(state.get("pages") or {})
+        if legacy_html_path and any(k in state for k in PAGE_KEYS):
+            pages.setdefault(legacy_html_path, {k: state[k] for k in PAGE_KEYS if k in state})
+        with self.conn:
+            for page, ps in pages.items():
+                ensure_aggregates(ps)
+                compact_history(ps, keep=len(ps.get("history") or []))
+                self.save_page(page, ps)
+        print(f"[STATE-DB] Imported {len(pages)} page(s) into {self.path}")
+
+
+def _history_row(r) -> dict:
+    out = {"timestamp_utc": r["timestamp_utc"], "action": r["action"], "changed_html": bool(r["changed_html"])}
+    if r["variant_key"]:
+        out["variant_key"] = r["variant_key"]
+    return out
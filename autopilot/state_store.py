@@ -1,18 +1,107 @@
 # autopilot/state_store.py
 import json
+import os
+import tempfile
 
 STATE_PATH = "autopilot/state.json"
 
+# History entries are references to cycle records: timestamp_utc identifies the
+# full record in autopilot/logs/cycles.jsonl, so only what decisions need is kept.
+HISTORY_REF_KEYS = ("timestamp_utc", "action", "changed_html", "variant_key")
+HISTORY_KEEP = 52
+
+# Keys that describe one page's experiment (multi-page mode keeps one set per page).
+PAGE_KEYS = (
+    "history",
+    "baseline",
+    "variants",
+    "best_variant_key",
+    "active_variant_key",
+    "active_variant",
+    "template_index_by_intent",
+    "current_template_index",
+    "sprt_evidence",
+    "sequential_test",
+)
+
 def load_state() -> dict:
     with open(STATE_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
 def save_state(state: dict) -> None:
-    with open(STATE_PATH, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+    """Compact, atomic write (temp file in the same dir + os.replace)."""
+    d = os.path.dirname(STATE_PATH) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".state.", suffix=".json", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+        # mkstemp creates 0600 files; keep the usual checkout permissions
+        os.chmod(tmp, os.stat(STATE_PATH).st_mode & 0o777 if os.path.exists(STATE_PATH) else 0o644)
+        os.replace(tmp, STATE_PATH)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _history_ref(item: dict) -> dict:
+    ref = {k: item[k] for k in HISTORY_REF_KEYS if k in item}
+    chosen = item.get("chosen") or {}
+    if "variant_key" not in ref and chosen.get("variant_key"):
+        ref["variant_key"] = chosen["variant_key"]
+    return ref
 
 def append_history(state: dict, item: dict) -> None:
-    state.setdefault("history", []).append(item)
+    state.setdefault("history", []).append(_history_ref(item))
+
+def compact_history(state: dict, keep: int = HISTORY_KEEP) -> None:
+    """Slim history entries to references and fold all but the last `keep` into a summary.
+
+    The summary keeps counts per action and the latest HTML change, so guardrail
+    and evaluation-window logic still work after old entries are dropped.
+    """
+    hist = [_history_ref(h) for h in state.get("history", [])]
+    cut = max(len(hist) - max(keep, 0), 0)
+    old, hist = hist[:cut], hist[cut:]
+    if old:
+        summ = state.setdefault("history_summary", {"count": 0, "first_utc": None, "last_utc": None, "actions": {}, "changes": 0, "last_change": None})
+        summ["count"] += len(old)
+        summ["first_utc"] = summ["first_utc"] or old[0].get("timestamp_utc")
+        summ["last_utc"] = old[-1].get("timestamp_utc")
+        for h in old:
+            a = h.get("action") or "-"
+            summ["actions"][a] = summ["actions"].get(a, 0) + 1
+            if h.get("changed_html") is True:
+                summ["changes"] += 1
+                summ["last_change"] = {"timestamp_utc": h.get("timestamp_utc"), "action": h.get("action")}
+    state["history"] = hist
+
+def last_change(state: dict, skip_actions: tuple = ()) -> dict:
+    """Latest history entry that changed the HTML (falling back to the compacted summary)."""
+    for item in reversed(state.get("history", [])):
+        if item.get("action") in skip_actions:
+            continue
+        if item.get("changed_html") is True and item.get("timestamp_utc"):
+            return item
+    lc = (state.get("history_summary") or {}).get("last_change")
+    if lc and lc.get("timestamp_utc") and lc.get("action") not in skip_actions:
+        return lc
+    return None
 
 def set_template_index(state: dict, idx: int) -> None:
     state["current_template_index"] = int(idx)
+
+def get_page_state(state: dict, html_path: str, legacy_html_path: str = None) -> dict:
+    """Return the per-page state dict stored under state["pages"][html_path].
+
+    The first time the legacy single page is seen in multi-page mode, its
+    top-level keys are moved under "pages" so its history is preserved.
+    """
+    pages = state.setdefault("pages", {})
+    if html_path not in pages:
+        ps = {}
+        if html_path == legacy_html_path:
+            for k in PAGE_KEYS:
+                if k in state:
+                    ps[k] = state.pop(k)
+        pages[html_path] = ps
+    return pages[html_path]